@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import multiprocessing
 import sys
 
 import uvicorn
@@ -25,6 +26,8 @@ def _load_app():
 
 
 def main() -> None:
+    # PyInstaller 打包后，进程池的子进程需要经由 freeze_support 启动
+    multiprocessing.freeze_support()
     args = parse_args()
     uvicorn.run(
         _load_app(),
@@ -1,13 +1,102 @@
+import sys
 from pathlib import Path
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
+# 语域档案名称，须与 services/lexicon.py 中 PROFILES 的键一致
+DifficultyProfile = Literal[
+    "overall", "subtitle", "spoken", "tvm", "fiction", "magazine", "news", "academic", "web"
+]
+
 
 class Settings(BaseSettings):
     youtube_api_key: str = Field(default="")
     youtube_api_base: str = "https://www.googleapis.com/youtube/v3"
 
+    # YouTube Data API 共享连接池
+    youtube_http2: bool = True
+    youtube_max_connections: int = Field(default=20, ge=1)
+    youtube_max_keepalive_connections: int = Field(default=10, ge=0)
+    youtube_keepalive_expiry: float = Field(default=30.0, ge=0)
+    youtube_connect_timeout: float = Field(default=5.0, gt=0)
+    youtube_default_timeout: float = Field(default=10.0, gt=0)
+    youtube_search_timeout: float = Field(default=10.0, gt=0)
+    youtube_videos_timeout: float = Field(default=8.0, gt=0)
+
+    # /api/youtube/search 响应缓存
+    search_cache_max_entries: int = Field(default=512, ge=1)
+    search_cache_ttl: float = Field(default=600.0, gt=0)
+    search_cache_persistent: bool = False
+
+    # 下一页预取（默认关闭，可通过 prefetch=true 按请求开启）
+    search_prefetch_enabled: bool = False
+    search_prefetch_ttl: float = Field(default=120.0, gt=0)
+    search_prefetch_concurrency: int = Field(default=4, ge=1)
+
+    # videos?part=contentDetails 微批量与单视频时长缓存
+    video_details_batch_window_ms: float = Field(default=5.0, ge=0)
+    duration_cache_max_entries: int = Field(default=20000, ge=1)
+    duration_cache_ttl: float = Field(default=7 * 24 * 3600, gt=0)
+
+    # 关键词翻译缓存与线程池
+    translation_cache_max_entries: int = Field(default=2048, ge=1)
+    translation_cache_ttl: float = Field(default=30 * 24 * 3600, gt=0)
+    translation_max_workers: int = Field(default=4, ge=1)
+    translation_timeout: float = Field(default=3.0, gt=0)
+
+    # 下载任务线程池
+    download_max_workers: int = Field(default=2, ge=1)
+    download_progress_interval: float = Field(default=0.5, ge=0)
+    # 下载进度写回任务表的间隔，用于崩溃后查看/续传
+    download_progress_persist_interval: float = Field(default=5.0, ge=0)
+    # yt-dlp 分片（DASH/HLS）并发下载数
+    download_concurrent_fragments: int = Field(default=4, ge=1)
+    batch_download_max_items: int = Field(default=500, ge=1)
+
+    # 收藏夹批量操作单次最多条目数，以及导入时每批写入的行数
+    favorites_bulk_max_items: int = Field(default=1000, ge=1)
+    favorites_import_chunk_size: int = Field(default=500, ge=1)
+    # 导入文件大小上限（字节）
+    favorites_import_max_bytes: int = Field(default=20 * 1024**2, ge=1)
+
+    # 难度分析后端：auto / python / numpy；auto 目前使用 python（见 scripts/benchmark_difficulty.py）
+    difficulty_backend: Literal["auto", "python", "numpy"] = "auto"
+    # 默认语域档案：overall 为 COCA 总体排名，subtitle 按影视 + 口语语料排名
+    difficulty_profile: DifficultyProfile = "overall"
+    # 批量分析进程池大小，0 表示使用 CPU 核数；条目少于阈值时在当前线程内完成
+    difficulty_pool_workers: int = Field(default=0, ge=0)
+    difficulty_parallel_min_items: int = Field(default=8, ge=1)
+    difficulty_batch_max_items: int = Field(default=500, ge=1)
+    # 流式分析最多保留的生词数，超过后内存不再增长
+    difficulty_stream_max_rare_tokens: int = Field(default=2000, ge=0)
+
+    # 字幕抓取 → 难度分析：字幕语言与并发抓取线程数
+    subtitle_language: str = "en"
+    subtitle_max_workers: int = Field(default=4, ge=1)
+    subtitle_batch_max_items: int = Field(default=50, ge=1)
+    # 后台分析队列上限，以及抓取临时失败后多久内不再重试（秒）
+    subtitle_queue_max_items: int = Field(default=200, ge=1)
+    subtitle_failure_ttl: float = Field(default=600.0, gt=0)
+
+    # 词形映射文件（scripts/build_inflections.py 生成），留空使用 data/inflections.txt.gz
+    lemma_index_path: str = ""
+
+    # 词表二进制快照（scripts/build_lexicon_snapshot.py 生成），留空使用 data/lexicon.bin
+    lexicon_snapshot_path: str = ""
+
+    # 词表版本检查间隔（秒），用于 import_coca 重新导入后的热加载
+    lexicon_reload_interval: float = Field(default=30.0, gt=0)
+
+    # yt-dlp 元数据缓存与 YoutubeDL 实例池
+    ytdlp_pool_size: int = Field(default=4, ge=1)
+    ytdlp_info_cache_max_entries: int = Field(default=256, ge=1)
+    # YouTube 媒体地址约 6 小时失效，缓存时间需明显短于此
+    ytdlp_info_cache_ttl: float = Field(default=1800.0, gt=0)
+    # 下载目录磁盘配额（字节），0 表示不限制
+    download_quota_bytes: int = Field(default=20 * 1024**3, ge=0)
+
     class Config:
         env_file = (
             Path.cwd() / ".env",
@@ -17,3 +106,9 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
+
+# 随程序分发的数据文件目录；PyInstaller 打包后位于解包目录下
+if getattr(sys, "frozen", False):
+    DATA_DIR = Path(getattr(sys, "_MEIPASS", Path(sys.executable).parent)) / "data"
+else:
+    DATA_DIR = Path(__file__).resolve().parent.parent / "data"
@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+import logging
+
+from sqlalchemy import create_engine, delete, func, inspect, select
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 DATABASE_URL = "sqlite:///./data.db"
@@ -14,6 +16,41 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
+
+# 旧版本创建、已被新索引取代的索引，启动时删除
+OBSOLETE_INDEXES = ("ix_favorite_videos_collection_video",)
+
+
+def ensure_indexes() -> None:
+    """create_all 不会给已存在的表补建索引，这里逐个按需创建。
+
+    补建唯一索引前先删除重复行（每组保留 id 最小的一行），保证依赖它的 ON CONFLICT 写入可用。
+    """
+    with engine.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{name}"')
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                if index.unique:
+                    _drop_duplicates(conn, index)
+                index.create(bind=conn)
+
+
+def _drop_duplicates(conn, index) -> None:
+    table = index.table
+    keep = select(func.min(table.c.id)).group_by(*index.columns)
+    removed = conn.execute(delete(table).where(table.c.id.not_in(keep))).rowcount
+    if removed:
+        logger.warning("创建唯一索引 %s 前删除了 %s 中 %d 条重复记录", index.name, table.name, removed)
+
 
 def get_db():
     db = SessionLocal()
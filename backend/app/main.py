@@ -1,13 +1,23 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routers import youtube, favorites, downloads
+from .routers import youtube, favorites, downloads, difficulty
 from license_service.routers import licenses as license_router
-from .database import Base, engine
+from .database import Base, engine, ensure_indexes
+from .config import settings
+from .services import lemmatizer, lexicon, translation, youtube_client
+from .services.analysis import difficulty_pool
+from .services.subtitles import difficulty_events, subtitle_pipeline
+from .services.jobs import job_manager, progress_broker
+from .services.metadata import ydl_pool
 from license_service.database import Base as LicenseBase, engine as license_engine
 
 app = FastAPI(title="YT Study Backend")
 
+_background_tasks: set[asyncio.Task] = set()
+
 
 @app.get("/health")
 def health_check():
@@ -17,8 +27,30 @@ def health_check():
 @app.on_event("startup")
 async def on_startup() -> None:
     Base.metadata.create_all(bind=engine)
+    ensure_indexes()
     async with license_engine.begin() as conn:
         await conn.run_sync(LicenseBase.metadata.create_all)
+    await youtube_client.startup()
+    progress_broker.bind_loop(asyncio.get_running_loop())
+    difficulty_events.bind_loop(asyncio.get_running_loop())
+    job_manager.start()
+    await asyncio.to_thread(lexicon.load_lexicon)
+    await asyncio.to_thread(lemmatizer.load_lemmatizer)
+    _background_tasks.add(asyncio.create_task(lexicon.watch(settings.lexicon_reload_interval)))
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    youtube.prefetcher.shutdown()
+    await youtube_client.shutdown()
+    translation.shutdown()
+    job_manager.shutdown()
+    ydl_pool.close()
+    difficulty_pool.shutdown()
+    subtitle_pipeline.shutdown()
 
 
 app.add_middleware(
@@ -37,6 +69,7 @@ def include_routers() -> None:
     app.include_router(youtube.router, prefix="/api/youtube", tags=["youtube"])
     app.include_router(favorites.router, prefix="/api/favorites", tags=["favorites"])
     app.include_router(downloads.router, prefix="/api/downloads", tags=["downloads"])
+    app.include_router(difficulty.router, prefix="/api/difficulty", tags=["difficulty"])
     app.include_router(license_router.router, prefix="/license", tags=["license"])
 
 
@@ -1,6 +1,21 @@
+import enum
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 
 from .database import Base
@@ -8,6 +23,7 @@ from .database import Base
 
 class Collection(Base):
     __tablename__ = "collections"
+    __table_args__ = (Index("ix_collections_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
@@ -19,6 +35,12 @@ class Collection(Base):
 
 class FavoriteVideo(Base):
     __tablename__ = "favorite_videos"
+    __table_args__ = (
+        # 收藏夹内按添加时间翻页
+        Index("ix_favorite_videos_collection_added", "collection_id", "added_at", "id"),
+        # 唯一索引而非表级约束：已有数据库也能在启动时补建，批量写入依赖它做 ON CONFLICT
+        Index("uq_favorite_videos_collection_video", "collection_id", "video_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     collection_id = Column(Integer, ForeignKey("collections.id", ondelete="CASCADE"), nullable=False)
@@ -41,3 +63,96 @@ class WordFrequency(Base):
     rank = Column(Integer, nullable=False)
     frequency = Column(Integer, nullable=False)
     per_million = Column(Float, nullable=True)
+    # 各语域每百万词频次（COCA 的 blogPM、spokPM、acadPM 等列）
+    blog_pm = Column(Float, nullable=True)
+    web_pm = Column(Float, nullable=True)
+    tvm_pm = Column(Float, nullable=True)
+    spok_pm = Column(Float, nullable=True)
+    fic_pm = Column(Float, nullable=True)
+    mag_pm = Column(Float, nullable=True)
+    news_pm = Column(Float, nullable=True)
+    acad_pm = Column(Float, nullable=True)
+
+
+class LexiconVersion(Base):
+    __tablename__ = "lexicon_versions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(String(64), nullable=False)
+    entries = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class CacheEntry(Base):
+    __tablename__ = "cache_entries"
+
+    namespace = Column(String(32), primary_key=True)
+    key = Column(Text, primary_key=True)
+    value = Column(Text, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class DownloadStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class DownloadJob(Base):
+    __tablename__ = "download_jobs"
+
+    id = Column(String(32), primary_key=True)
+    batch_id = Column(String(32), nullable=True, index=True)
+    video_id = Column(String(32), nullable=False, index=True)
+    format_code = Column(String(64), nullable=True)
+    audio_only = Column(Boolean, nullable=False, default=False)
+    concurrent_fragments = Column(Integer, nullable=True)
+    status = Column(Enum(DownloadStatus), nullable=False, default=DownloadStatus.QUEUED, index=True)
+    error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    downloaded_bytes = Column(BigInteger, nullable=True)
+    total_bytes = Column(BigInteger, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class DownloadedFile(Base):
+    __tablename__ = "downloaded_files"
+    __table_args__ = (
+        UniqueConstraint("video_id", "format_selector", "audio_only", name="uq_downloaded_file_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    video_id = Column(String(32), nullable=False, index=True)
+    format_selector = Column(String(64), nullable=False)
+    audio_only = Column(Boolean, nullable=False, default=False)
+    storage_key = Column(String(40), nullable=False, unique=True)
+    filepath = Column(String(1024), nullable=False)
+    filesize = Column(BigInteger, nullable=True)
+    title = Column(String(255), nullable=True)
+    ext = Column(String(16), nullable=True)
+    duration = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_accessed_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class VideoDifficulty(Base):
+    __tablename__ = "video_difficulties"
+    __table_args__ = (
+        UniqueConstraint("video_id", "lexicon_version", name="uq_video_difficulty_version"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    video_id = Column(String(32), nullable=False)
+    lexicon_version = Column(String(64), nullable=False)
+    language = Column(String(16), nullable=True)
+    difficulty_level = Column(String(32), nullable=True)
+    coverage_ratio = Column(Float, nullable=True)
+    stats = Column(JSON, nullable=True)
+    # 没有可用字幕等情况记录原因，避免反复抓取
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,231 @@
+import asyncio
+import codecs
+import json
+from dataclasses import asdict
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..schemas import (
+    DifficultyBatchRequest,
+    DifficultyBatchResponse,
+    VideoDifficultyRequest,
+    VideoDifficultyResponse,
+    VideoDifficultyResult,
+)
+from ..services.analysis import aggregate, difficulty_pool
+from ..services.difficulty import DifficultyAnalyzer, DifficultyStats
+from ..services.lexicon import PROFILES, get_lexicon
+from ..services.subtitles import STATUS_MISSING, difficulty_events, subtitle_pipeline
+
+router = APIRouter()
+
+
+def _check_profile(profile: str | None) -> str:
+    profile = profile or settings.difficulty_profile
+    if profile not in PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"未知的语域档案 {profile}，可选：{', '.join(PROFILES)}",
+        )
+    return profile
+
+
+@router.post("/batch", summary="批量分析字幕难度", response_model=DifficultyBatchResponse)
+def analyse_batch(payload: DifficultyBatchRequest):
+    if not payload.items and not payload.video_ids:
+        raise HTTPException(status_code=400, detail="items 与 video_ids 不能同时为空")
+    if len(payload.items) > settings.difficulty_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多分析 {settings.difficulty_batch_max_items} 条字幕",
+        )
+    _check_video_count(payload.video_ids)
+
+    profile = _check_profile(payload.profile)
+    stats = difficulty_pool.analyse_many([item.text for item in payload.items], profile)
+    videos = _video_results(payload.video_ids, profile)
+    return {
+        "lexicon_version": get_lexicon().version,
+        "profile": profile,
+        "items": [
+            {"id": item.id, "stats": asdict(result)}
+            for item, result in zip(payload.items, stats)
+        ],
+        "videos": videos,
+        "aggregate": aggregate(stats + _video_stats(videos)),
+    }
+
+
+def _check_video_count(video_ids: list[str]) -> None:
+    if len(video_ids) > settings.subtitle_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多分析 {settings.subtitle_batch_max_items} 个视频",
+        )
+
+
+def _video_results(video_ids: list[str], profile: str | None = None) -> list[dict]:
+    if not video_ids:
+        return []
+    results = subtitle_pipeline.analyse_videos(video_ids, profile)
+    return [results[video_id] for video_id in dict.fromkeys(video_ids)]
+
+
+def _video_stats(videos: list[dict]) -> list[DifficultyStats]:
+    return [DifficultyStats(**video["stats"]) for video in videos if video["stats"] is not None]
+
+
+class _UploadStreamingResponse(StreamingResponse):
+    """响应体边读取请求体边生成。
+
+    请求体读完之前不另外监听断开：``listen_for_disconnect`` 与 ``request.stream()``
+    共用同一个 ``receive``，提前监听会抢走请求体消息。读取期间的断开由 ``request.stream()`` 抛出。
+    """
+
+    def __init__(self, content, body_consumed: asyncio.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_consumed = body_consumed
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await self.body_consumed.wait()
+        await super().listen_for_disconnect(receive)
+
+
+@router.post("/stream", summary="流式分析超长字幕文本")
+async def analyse_stream(
+    request: Request,
+    interval: int | None = Query(None, ge=1),
+    profile: str | None = Query(None, description="语域档案，例如 overall、subtitle、academic"),
+):
+    """请求体为任意长度的 UTF-8 文本，边接收边分析，不在内存中拼接整段字幕。
+
+    响应为 NDJSON：指定 ``interval`` 时每累计该数量的词立即输出一行
+    ``{"type": "interim", "stats": ...}``，最后一行为 ``{"type": "result", ...}``。
+    """
+    analyzer = DifficultyAnalyzer(profile=_check_profile(profile))
+    accumulator = analyzer.accumulator()
+    body_consumed = asyncio.Event()
+
+    async def results():
+        # 增量解码，多字节字符被切在两个数据块之间时也能正确拼接
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        next_report = interval
+        try:
+            async for data in request.stream():
+                # 分词与查表在线程中执行，不阻塞事件循环
+                await asyncio.to_thread(accumulator.feed, decoder.decode(data))
+                if next_report is not None and accumulator.total_tokens >= next_report:
+                    next_report = accumulator.total_tokens + interval
+                    yield _ndjson({"type": "interim", "stats": asdict(accumulator.snapshot())})
+        finally:
+            body_consumed.set()
+        accumulator.feed(decoder.decode(b"", final=True))
+        stats = await asyncio.to_thread(accumulator.finish)
+        yield _ndjson(
+            {
+                "type": "result",
+                "lexicon_version": analyzer.lexicon.version,
+                "profile": analyzer.profile,
+                "stats": asdict(stats),
+            }
+        )
+
+    return _UploadStreamingResponse(
+        results(),
+        body_consumed,
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+def _parse_video_ids(ids: str) -> list[str]:
+    video_ids = list(dict.fromkeys(part.strip() for part in ids.split(",") if part.strip()))
+    if not video_ids:
+        raise HTTPException(status_code=400, detail="ids 不能为空")
+    if len(video_ids) > settings.subtitle_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多查询 {settings.subtitle_batch_max_items} 个视频",
+        )
+    return video_ids
+
+
+@router.get("/videos", summary="查询视频字幕难度（不触发同步抓取）")
+def poll_videos(ids: str = Query(..., description="逗号分隔的视频 ID")):
+    video_ids = _parse_video_ids(ids)
+    cached = subtitle_pipeline.lookup(video_ids)
+    items = []
+    for video_id in video_ids:
+        result = cached.get(video_id)
+        status = subtitle_pipeline.status(video_id, result)
+        items.append({"status": status, **(result or {"video_id": video_id})})
+    return {"items": items}
+
+
+@router.get("/videos/events", summary="订阅视频字幕难度结果（SSE）")
+async def stream_video_events(ids: str = Query(..., description="逗号分隔的视频 ID")):
+    video_ids = _parse_video_ids(ids)
+    cached = await asyncio.to_thread(subtitle_pipeline.lookup, video_ids)
+    misses = [video_id for video_id in video_ids if video_id not in cached]
+    queued = set(subtitle_pipeline.schedule(misses))
+    # 队列已满未能排队的视频直接告知客户端，不等待不会到来的事件
+    waiting = [
+        video_id for video_id in misses if video_id in queued or subtitle_pipeline.is_pending(video_id)
+    ]
+    unscheduled = [video_id for video_id in misses if video_id not in waiting]
+
+    async def event_stream():
+        for video_id, result in cached.items():
+            yield _sse({"status": subtitle_pipeline.status(video_id, result), **result})
+        for video_id in unscheduled:
+            yield _sse({"status": STATUS_MISSING, "video_id": video_id})
+        if not waiting:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def forward(video_id: str) -> None:
+            async for event in difficulty_events.subscribe(video_id):
+                await queue.put(event)
+
+        tasks = [asyncio.create_task(forward(video_id)) for video_id in waiting]
+        remaining = set(waiting)
+        try:
+            while remaining:
+                event = await queue.get()
+                if event is not None:
+                    remaining.discard(event["video_id"])
+                yield _sse(event)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: dict | None) -> str:
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"event: difficulty\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.get("/videos/{video_id}", summary="分析视频字幕难度", response_model=VideoDifficultyResult)
+def analyse_video(video_id: str):
+    return subtitle_pipeline.analyse_video(video_id)
+
+
+@router.post("/videos", summary="批量分析视频字幕难度", response_model=VideoDifficultyResponse)
+def analyse_videos(payload: VideoDifficultyRequest):
+    _check_video_count(payload.video_ids)
+    videos = _video_results(payload.video_ids)
+    return {"items": videos, "aggregate": aggregate(_video_stats(videos))}
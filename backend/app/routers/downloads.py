@@ -1,20 +1,184 @@
-from fastapi import APIRouter, HTTPException
+import json
+import uuid
+from collections import Counter
 
-from ..services.download import DownloadError, download_video
-from ..schemas import DownloadRequest, DownloadResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+from ..database import get_db
+from ..models import DownloadStatus
+from ..schemas import (
+    BatchDownloadRequest,
+    BatchDownloadResponse,
+    BatchStatus,
+    DownloadJob,
+    DownloadJobResponse,
+    DownloadRequest,
+    VideoInfo,
+)
+from ..services.download import DownloadError, expand_playlist
+from ..services.jobs import job_manager, progress_broker
+from ..services.metadata import metadata_service
+from ..services.store import download_store
 
 router = APIRouter()
 
 
-@router.post("/", summary="下载 YouTube 视频", response_model=DownloadResponse)
+@router.post(
+    "/",
+    summary="提交 YouTube 视频下载任务",
+    response_model=DownloadJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 def trigger_download(payload: DownloadRequest):
+    job = job_manager.submit(
+        video_id=payload.video_id,
+        format_code=payload.format_code,
+        audio_only=payload.audio_only,
+        concurrent_fragments=payload.concurrent_fragments,
+    )
+    return {"message": "已加入下载队列", "data": job}
+
+
+@router.get("/info/{video_id}", summary="视频元数据与可用格式列表", response_model=VideoInfo)
+def get_video_info(video_id: str):
     try:
-        result = download_video(
-            video_id=payload.video_id,
-            format_code=payload.format_code,
-            audio_only=payload.audio_only,
-        )
+        return metadata_service.describe(video_id)
     except DownloadError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    return {"message": "下载完成", "data": result}
+
+@router.post(
+    "/batch",
+    summary="批量下载（视频列表 / 收藏夹 / 播放列表）",
+    response_model=BatchDownloadResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def trigger_batch_download(payload: BatchDownloadRequest, db: Session = Depends(get_db)):
+    video_ids = list(payload.video_ids)
+
+    if payload.collection_id is not None:
+        if db.get(models.Collection, payload.collection_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="收藏夹不存在")
+        video_ids.extend(
+            db.scalars(
+                select(models.FavoriteVideo.video_id)
+                .where(models.FavoriteVideo.collection_id == payload.collection_id)
+                .order_by(models.FavoriteVideo.added_at)
+            ).all()
+        )
+
+    if payload.playlist_url:
+        try:
+            video_ids.extend(expand_playlist(payload.playlist_url))
+        except DownloadError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    video_ids = list(dict.fromkeys(video_ids))
+    if not video_ids:
+        raise HTTPException(status_code=400, detail="没有需要下载的视频")
+    if len(video_ids) > settings.batch_download_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多下载 {settings.batch_download_max_items} 个视频",
+        )
+
+    batch_id = uuid.uuid4().hex
+    jobs = job_manager.submit_many(
+        video_ids,
+        format_code=payload.format_code,
+        audio_only=payload.audio_only,
+        concurrent_fragments=payload.concurrent_fragments,
+        batch_id=batch_id,
+    )
+    return {"message": f"已加入下载队列：{len(jobs)} 个视频", "batch_id": batch_id, "data": jobs}
+
+
+@router.get("/batches/{batch_id}", summary="查询批量下载进度", response_model=BatchStatus)
+def get_batch(batch_id: str):
+    jobs = job_manager.list(batch_id=batch_id, limit=None)
+    if not jobs:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="批量任务不存在")
+    counts = Counter(job.status.value for job in jobs)
+    return {"batch_id": batch_id, "total": len(jobs), "counts": counts, "jobs": jobs}
+
+
+@router.get("/jobs", summary="下载任务列表", response_model=list[DownloadJob])
+def list_jobs(
+    job_status: DownloadStatus | None = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=200),
+):
+    return job_manager.list(status=job_status, limit=limit)
+
+
+@router.get("/jobs/{job_id}", summary="查询下载任务状态", response_model=DownloadJob)
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="下载任务不存在")
+    return job
+
+
+@router.post("/jobs/{job_id}/cancel", summary="取消下载任务", response_model=DownloadJob)
+def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="下载任务不存在")
+    return job
+
+
+def _sse(event: dict | None) -> str:
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"event: progress\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.get("/jobs/{job_id}/events", summary="下载进度事件流（SSE）")
+async def stream_job_events(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="下载任务不存在")
+
+    async def event_stream():
+        if job.status in (DownloadStatus.COMPLETED, DownloadStatus.FAILED, DownloadStatus.CANCELLED):
+            yield _sse(
+                {
+                    "jobId": job.id,
+                    "status": job.status.value,
+                    "stage": job.status.value,
+                    "error": job.error,
+                    "result": job.result,
+                }
+            )
+            return
+        async for event in progress_broker.subscribe(job_id):
+            yield _sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.api_route(
+    "/files/{file_id}",
+    methods=["GET", "HEAD"],
+    summary="播放/下载已下载的媒体文件（支持 Range）",
+)
+def stream_file(file_id: str):
+    path = download_store.get_file(file_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="文件不存在")
+
+    # FileResponse 负责 Range/If-Range、ETag 与 Last-Modified，
+    # 服务器支持 pathsend 扩展时直接零拷贝发送
+    return FileResponse(
+        path,
+        filename=path.name,
+        content_disposition_type="inline",
+    )
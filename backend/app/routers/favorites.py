@@ -1,21 +1,107 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, selectinload
+import csv
+import tempfile
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..database import get_db
+from ..config import settings
+from ..database import SessionLocal, get_db
+from ..services import favorites as favorites_service
+from ..services.pagination import InvalidCursor, paginate_desc, split_page
 
 router = APIRouter()
 
 
-@router.get("/collections", response_model=list[schemas.Collection])
-def list_collections(db: Session = Depends(get_db)):
-    collections = (
-        db.query(models.Collection)
-        .options(selectinload(models.Collection.favorites))
-        .order_by(models.Collection.created_at.desc())
-        .all()
+def _favorite_count():
+    # 相关子查询走 (collection_id, added_at, id) 索引，只统计当前页的收藏夹
+    return (
+        select(func.count(models.FavoriteVideo.id))
+        .where(models.FavoriteVideo.collection_id == models.Collection.id)
+        .correlate(models.Collection)
+        .scalar_subquery()
+    )
+
+
+@router.get("/collections", response_model=schemas.CollectionPage)
+def list_collections(
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    stmt = select(models.Collection, _favorite_count().label("favorite_count"))
+    try:
+        stmt = paginate_desc(stmt, models.Collection.created_at, models.Collection.id, cursor, limit)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    rows, next_cursor = split_page(
+        db.execute(stmt).all(), limit, key=lambda row: (row[0].created_at, row[0].id)
+    )
+    items = [
+        {
+            "id": collection.id,
+            "name": collection.name,
+            "description": collection.description,
+            "created_at": collection.created_at,
+            "favorite_count": favorite_count,
+        }
+        for collection, favorite_count in rows
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/collections/summary", response_model=schemas.FavoritesSummary)
+def collections_summary(db: Session = Depends(get_db)):
+    """只返回计数：一次 LEFT JOIN + GROUP BY 聚合，不加载收藏记录。"""
+    rows = db.execute(
+        select(
+            models.Collection.id,
+            models.Collection.name,
+            func.count(models.FavoriteVideo.id),
+            func.max(models.FavoriteVideo.added_at),
+        )
+        .outerjoin(models.FavoriteVideo, models.FavoriteVideo.collection_id == models.Collection.id)
+        .group_by(models.Collection.id)
+        .order_by(models.Collection.created_at.desc(), models.Collection.id.desc())
+    ).all()
+    items = [
+        {"id": id_, "name": name, "favorite_count": count, "last_added_at": last_added_at}
+        for id_, name, count, last_added_at in rows
+    ]
+    return {
+        "collections": len(items),
+        "favorites": sum(item["favorite_count"] for item in items),
+        "items": items,
+    }
+
+
+@router.get("/collections/{collection_id}/favorites", response_model=schemas.FavoritePage)
+def list_favorites(
+    collection_id: int,
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    if db.get(models.Collection, collection_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="收藏夹不存在")
+
+    stmt = select(models.FavoriteVideo).where(models.FavoriteVideo.collection_id == collection_id)
+    try:
+        stmt = paginate_desc(
+            stmt, models.FavoriteVideo.added_at, models.FavoriteVideo.id, cursor, limit
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    favorites, next_cursor = split_page(
+        db.scalars(stmt).all(), limit, key=lambda favorite: (favorite.added_at, favorite.id)
     )
-    return collections
+    return {"items": favorites, "next_cursor": next_cursor}
 
 
 @router.post("/collections", response_model=schemas.Collection, status_code=status.HTTP_201_CREATED)
@@ -72,3 +158,137 @@ def remove_favorite(favorite_id: int, db: Session = Depends(get_db)):
     db.delete(favorite)
     db.commit()
     return None
+
+
+def _get_collection(db: Session, collection_id: int) -> models.Collection:
+    collection = db.get(models.Collection, collection_id)
+    if not collection:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="收藏夹不存在")
+    return collection
+
+
+def _check_bulk_size(count: int) -> None:
+    if count > settings.favorites_bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"单次最多处理 {settings.favorites_bulk_max_items} 条收藏",
+        )
+
+
+@router.post("/collections/{collection_id}/favorites/bulk", response_model=schemas.FavoriteBulkResult)
+def bulk_add_favorites(
+    collection_id: int, payload: schemas.FavoriteBulkCreate, db: Session = Depends(get_db)
+):
+    _check_bulk_size(len(payload.items))
+    _get_collection(db, collection_id)
+    added = favorites_service.add_favorites(db, collection_id, (item.dict() for item in payload.items))
+    db.commit()
+    return {"collection_id": collection_id, "added": added, "skipped": len(payload.items) - added}
+
+
+@router.post("/collections/{collection_id}/favorites/remove", response_model=schemas.FavoriteBulkResult)
+def bulk_remove_favorites(
+    collection_id: int, payload: schemas.FavoriteVideoIds, db: Session = Depends(get_db)
+):
+    _check_bulk_size(len(payload.video_ids))
+    _get_collection(db, collection_id)
+    removed = favorites_service.remove_favorites(db, collection_id, payload.video_ids)
+    db.commit()
+    return {"collection_id": collection_id, "removed": removed}
+
+
+@router.post("/collections/{collection_id}/favorites/move", response_model=schemas.FavoriteBulkResult)
+def bulk_move_favorites(collection_id: int, payload: schemas.FavoriteMove, db: Session = Depends(get_db)):
+    _check_bulk_size(len(payload.video_ids))
+    if payload.target_collection_id == collection_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="目标收藏夹与源收藏夹相同")
+    _get_collection(db, collection_id)
+    _get_collection(db, payload.target_collection_id)
+    moved, merged = favorites_service.move_favorites(
+        db, collection_id, payload.target_collection_id, payload.video_ids
+    )
+    db.commit()
+    return {"collection_id": payload.target_collection_id, "moved": moved, "merged": merged}
+
+
+@router.get("/collections/{collection_id}/export", summary="导出收藏夹（流式 JSON/CSV）")
+def export_collection(
+    collection_id: int,
+    format: Literal["json", "csv"] = Query("json"),
+    db: Session = Depends(get_db),
+):
+    collection = _get_collection(db, collection_id)
+    if format == "csv":
+        body, media_type = favorites_service.export_csv(collection), "text/csv; charset=utf-8"
+    else:
+        body, media_type = favorites_service.export_json(collection), "application/json"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="collection-{collection_id}.{format}"'},
+    )
+
+
+@router.post(
+    "/collections/import",
+    response_model=schemas.FavoriteBulkResult,
+    status_code=status.HTTP_201_CREATED,
+    summary="从导出的 JSON/CSV 文件创建收藏夹",
+)
+async def import_collection(
+    request: Request,
+    format: Literal["json", "csv"] = Query("json"),
+    name: str | None = Query(None, max_length=100, description="收藏夹名称，默认取自 JSON 文件"),
+):
+    limit = settings.favorites_import_max_bytes
+    too_large = HTTPException(status_code=413, detail=f"导入文件超过 {limit} 字节")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > limit:
+        raise too_large
+
+    # 请求体先写入临时文件（小文件留在内存），解析和写库在线程中完成
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        received = 0
+        async for data in request.stream():
+            received += len(data)
+            if received > limit:
+                raise too_large
+            spool.write(data)
+        spool.seek(0)
+        return await run_in_threadpool(_import_spooled, spool, format, name)
+    finally:
+        spool.close()
+
+
+def _import_spooled(spool, fmt: str, name: str | None) -> dict:
+    try:
+        header, records = favorites_service.parse_import(spool, fmt)
+    except (ValueError, UnicodeDecodeError, AttributeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"无法解析导入文件: {exc}"
+        ) from exc
+
+    with SessionLocal() as db:
+        collection = models.Collection(
+            name=(name or header.get("name") or "导入的收藏夹")[:100],
+            description=header.get("description"),
+        )
+        db.add(collection)
+        db.flush()
+        try:
+            added, duplicates, invalid = favorites_service.import_favorites(
+                db, collection.id, records, settings.favorites_import_chunk_size
+            )
+        except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"无法解析导入文件: {exc}"
+            ) from exc
+        db.commit()
+        return {
+            "collection_id": collection.id,
+            "added": added,
+            "skipped": duplicates,
+            "invalid": invalid,
+        }
@@ -1,82 +1,113 @@
-from fastapi import APIRouter, HTTPException, Query
-import httpx
-from deep_translator import GoogleTranslator
-from langdetect import LangDetectException, detect
+import asyncio
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
 
 from ..config import settings
+from ..services import video_details, youtube_client
+from ..services.cache import TTLCache, make_key
+from ..services.prefetch import Prefetcher
+from ..services.subtitles import subtitle_pipeline
+from ..services.translation import (
+    normalize_lang_code,
+    translate_keyword,
+    translation_cache,
+)
 
 router = APIRouter()
 
-LANGUAGE_ALIAS: dict[str, str] = {
-    "zh": "zh-cn",
-    "zh-cn": "zh-cn",
-    "zh-hans": "zh-cn",
-    "zh-tw": "zh-tw",
-    "en": "en",
-    "ja": "ja",
-    "ko": "ko",
-}
-
 THEME_YOUTUBE = "youtube"
 THEME_KIDS = "kids"
 ALLOWED_THEMES = {THEME_YOUTUBE, THEME_KIDS}
 
+search_cache = TTLCache(
+    "youtube_search",
+    maxsize=settings.search_cache_max_entries,
+    ttl=settings.search_cache_ttl,
+    persistent=settings.search_cache_persistent,
+)
+
+prefetcher = Prefetcher(
+    search_cache,
+    ttl=settings.search_prefetch_ttl,
+    concurrency=settings.search_prefetch_concurrency,
+)
+
+
+def _search_cache_key(
+    translated_keyword: str,
+    language: str | None,
+    duration: str | None,
+    theme: str,
+    max_results: int,
+    page_token: str | None,
+) -> str:
+    return make_key(
+        translated_keyword.strip().lower(),
+        language,
+        duration,
+        theme,
+        max_results,
+        page_token,
+    )
+
+
+async def _fetch_search_page(params: dict[str, object]) -> dict[str, object]:
+    resp = await youtube_client.api_get("search", params)
 
-def _normalize_lang_code(lang: str | None) -> str | None:
-    if not lang:
-        return None
-    lang_lower = lang.lower()
-    return LANGUAGE_ALIAS.get(lang_lower, lang_lower)
-
-
-def translate_keyword_if_needed(keyword: str, target_lang: str | None) -> tuple[str, str | None]:
-    if not target_lang:
-        return keyword, None
-
-    normalized_target = _normalize_lang_code(target_lang)
-    if not normalized_target:
-        return keyword, None
-
-    try:
-        detected_lang = detect(keyword)
-    except LangDetectException:
-        detected_lang = None
-
-    if detected_lang and _normalize_lang_code(detected_lang) == normalized_target:
-        return keyword, detected_lang
+    if resp.status_code != 200:
+        raise HTTPException(status_code=resp.status_code, detail=resp.json())
 
-    try:
-        translator = GoogleTranslator(source="auto", target=normalized_target)
-        translated_text = translator.translate(keyword)
-        if translated_text and isinstance(translated_text, str):
-            return translated_text, detected_lang
-    except Exception:
-        # 如果翻译失败，保持原始关键词
-        pass
+    payload = resp.json()
+    items = payload.get("items", [])
+    durations = await video_details.batcher.get_durations(
+        item["id"]["videoId"] for item in items if item.get("id")
+    )
 
-    return keyword, detected_lang
+    results = []
+    for item in items:
+        video_id = item["id"]["videoId"]
+        snippet = item["snippet"]
+        results.append(
+            {
+                "videoId": video_id,
+                "title": snippet["title"],
+                "description": snippet["description"],
+                "thumbnail": snippet["thumbnails"]["high"]["url"],
+                "channelTitle": snippet["channelTitle"],
+                "publishedAt": snippet["publishedAt"],
+                "durationISO8601": durations.get(video_id),
+            }
+        )
+    return {
+        "items": results,
+        "nextPageToken": payload.get("nextPageToken"),
+        "prevPageToken": payload.get("prevPageToken"),
+        "pageInfo": payload.get("pageInfo", {}),
+    }
 
 
 @router.get("/search")
 async def search_videos(
+    background_tasks: BackgroundTasks,
     keyword: str = Query(..., min_length=1),
     language: str | None = Query(None, description="语言代码，例如 en、zh"),
     duration: str | None = Query(None, description="持续时间：short/medium/long"),
     max_results: int = Query(12, ge=1, le=50),
     theme: str = Query(THEME_YOUTUBE, description="主题：youtube 或 kids"),
     page_token: str | None = Query(None, alias="pageToken", description="翻页令牌"),
+    prefetch: bool | None = Query(None, description="是否在后台预取下一页，默认取决于服务端配置"),
+    with_difficulty: bool = Query(False, alias="withDifficulty", description="是否附带字幕难度"),
 ):
     if theme not in ALLOWED_THEMES:
         raise HTTPException(status_code=400, detail="不支持的主题类型")
 
-    normalized_language = _normalize_lang_code(language)
-    translated_keyword, detected_lang = translate_keyword_if_needed(keyword, normalized_language)
+    normalized_language = normalize_lang_code(language)
+    translated_keyword, detected_lang = await translate_keyword(keyword, normalized_language)
 
     params = {
         "part": "snippet",
         "type": "video",
         "maxResults": max_results,
-        "key": settings.youtube_api_key,
     }
     if normalized_language:
         params["relevanceLanguage"] = normalized_language
@@ -96,52 +127,30 @@ async def search_videos(
     if page_token:
         params["pageToken"] = page_token
 
-    async with httpx.AsyncClient(base_url=settings.youtube_api_base, timeout=10.0) as client:
-        resp = await client.get("search", params=params)
-
-    if resp.status_code != 200:
-        raise HTTPException(status_code=resp.status_code, detail=resp.json())
+    cache_key = _search_cache_key(
+        translated_keyword, normalized_language, duration, theme, max_results, page_token
+    )
+    page = await search_cache.get_or_fetch(cache_key, lambda: _fetch_search_page(params))
+    prefetcher.mark_used(cache_key, page)
+
+    next_page_token = page["nextPageToken"]
+    should_prefetch = settings.search_prefetch_enabled if prefetch is None else prefetch
+    if should_prefetch and next_page_token:
+        next_key = _search_cache_key(
+            translated_keyword, normalized_language, duration, theme, max_results, next_page_token
+        )
+        next_params = {**params, "pageToken": next_page_token}
+        background_tasks.add_task(
+            prefetcher.schedule, next_key, lambda: _fetch_search_page(next_params)
+        )
 
-    payload = resp.json()
-    items = payload.get("items", [])
-    next_page_token = payload.get("nextPageToken")
-    prev_page_token = payload.get("prevPageToken")
-    page_info = payload.get("pageInfo", {})
-    video_ids = ",".join(item["id"]["videoId"] for item in items if item.get("id"))
-    durations: dict[str, str] = {}
-
-    if video_ids:
-        async with httpx.AsyncClient(base_url=settings.youtube_api_base, timeout=10.0) as client:
-            detail_resp = await client.get(
-                "videos",
-                params={
-                    "part": "contentDetails",
-                    "id": video_ids,
-                    "key": settings.youtube_api_key,
-                },
-            )
-        if detail_resp.status_code == 200:
-            for item in detail_resp.json().get("items", []):
-                durations[item["id"]] = item["contentDetails"]["duration"]
+    items = page["items"]
+    if with_difficulty:
+        items = await _attach_difficulty(items)
 
-    results = []
-    for item in items:
-        video_id = item["id"]["videoId"]
-        snippet = item["snippet"]
-        results.append(
-            {
-                "videoId": video_id,
-                "title": snippet["title"],
-                "description": snippet["description"],
-                "thumbnail": snippet["thumbnails"]["high"]["url"],
-                "channelTitle": snippet["channelTitle"],
-                "publishedAt": snippet["publishedAt"],
-                "durationISO8601": durations.get(video_id),
-            }
-        )
     return {
-        "count": len(results),
-        "items": results,
+        "count": len(items),
+        "items": items,
         "meta": {
             "originalKeyword": keyword,
             "translatedKeyword": translated_keyword,
@@ -150,7 +159,39 @@ async def search_videos(
             "theme": theme,
             "searchKeywordUsed": search_keyword,
             "nextPageToken": next_page_token,
-            "prevPageToken": prev_page_token,
-            "pageInfo": page_info,
+            "prevPageToken": page["prevPageToken"],
+            "pageInfo": page["pageInfo"],
         },
     }
+
+
+async def _attach_difficulty(items: list[dict[str, object]]) -> list[dict[str, object]]:
+    """只读取难度缓存表，未命中的视频交给后台分析，搜索响应不等待字幕下载。
+
+    缓存的搜索结果页是共享对象，这里返回附带难度的浅拷贝而不原地修改。
+    """
+    video_ids = [item["videoId"] for item in items]
+    cached = await asyncio.to_thread(subtitle_pipeline.lookup, video_ids)
+    subtitle_pipeline.schedule(video_id for video_id in video_ids if video_id not in cached)
+
+    enriched = []
+    for item in items:
+        result = cached.get(item["videoId"])
+        difficulty = {"status": subtitle_pipeline.status(item["videoId"], result)}
+        if result is not None and result["stats"] is not None:
+            difficulty["level"] = result["stats"]["difficulty_level"]
+            difficulty["coverageRatio"] = result["stats"]["coverage_ratio"]
+        elif result is not None:
+            difficulty["error"] = result["error"]
+        enriched.append({**item, "difficulty": difficulty})
+    return enriched
+
+
+@router.get("/cache/stats")
+def cache_stats():
+    return {
+        "search": search_cache.stats(),
+        "translation": translation_cache.stats(),
+        "videoDetails": video_details.batcher.stats(),
+        "prefetch": prefetcher.stats(),
+    }
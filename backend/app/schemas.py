@@ -42,12 +42,194 @@ class Collection(BaseModel):
         orm_mode = True
 
 
+class CollectionListItem(CollectionBase):
+    id: int
+    created_at: datetime
+    favorite_count: int = 0
+
+
+class CollectionPage(BaseModel):
+    items: list[CollectionListItem]
+    next_cursor: Optional[str] = None
+
+
+class FavoritePage(BaseModel):
+    items: list[FavoriteVideo]
+    next_cursor: Optional[str] = None
+
+
+class CollectionCount(BaseModel):
+    id: int
+    name: str
+    favorite_count: int
+    last_added_at: Optional[datetime] = None
+
+
+class FavoritesSummary(BaseModel):
+    collections: int
+    favorites: int
+    items: list[CollectionCount]
+
+
+class FavoriteBulkCreate(BaseModel):
+    items: list[FavoriteVideoCreate] = Field(..., min_length=1)
+
+
+class FavoriteVideoIds(BaseModel):
+    video_ids: list[str] = Field(..., min_length=1)
+
+
+class FavoriteMove(FavoriteVideoIds):
+    target_collection_id: int
+
+
+class FavoriteBulkResult(BaseModel):
+    collection_id: int
+    added: int = 0
+    skipped: int = 0
+    removed: int = 0
+    moved: int = 0
+    merged: int = 0
+    invalid: int = 0
+
+
 class DownloadRequest(BaseModel):
     video_id: str
     format_code: Optional[str] = None
     audio_only: bool = False
+    concurrent_fragments: Optional[int] = Field(None, ge=1, le=32)
+
+
+class BatchDownloadRequest(BaseModel):
+    video_ids: list[str] = []
+    collection_id: Optional[int] = None
+    playlist_url: Optional[str] = None
+    format_code: Optional[str] = None
+    audio_only: bool = False
+    concurrent_fragments: Optional[int] = Field(None, ge=1, le=32)
 
 
-class DownloadResponse(BaseModel):
+class DownloadJob(BaseModel):
+    id: str
+    batch_id: Optional[str] = None
+    video_id: str
+    format_code: Optional[str] = None
+    audio_only: bool
+    concurrent_fragments: Optional[int] = None
+    status: str
+    error: Optional[str] = None
+    result: Optional[dict[str, Any]] = None
+    attempts: int = 0
+    downloaded_bytes: Optional[int] = None
+    total_bytes: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class DownloadJobResponse(BaseModel):
+    message: str
+    data: DownloadJob
+
+
+class BatchDownloadResponse(BaseModel):
     message: str
-    data: dict[str, Any]
+    batch_id: str
+    data: list[DownloadJob]
+
+
+class BatchStatus(BaseModel):
+    batch_id: str
+    total: int
+    counts: dict[str, int]
+    jobs: list[DownloadJob]
+
+
+class VideoFormat(BaseModel):
+    format_id: Optional[str] = None
+    ext: Optional[str] = None
+    resolution: Optional[str] = None
+    fps: Optional[float] = None
+    vcodec: Optional[str] = None
+    acodec: Optional[str] = None
+    tbr: Optional[float] = None
+    filesize: Optional[int] = None
+    format_note: Optional[str] = None
+
+
+class VideoInfo(BaseModel):
+    video_id: str
+    title: Optional[str] = None
+    channel: Optional[str] = None
+    duration: Optional[float] = None
+    thumbnail: Optional[str] = None
+    upload_date: Optional[str] = None
+    formats: list[VideoFormat] = []
+
+
+class DifficultyStats(BaseModel):
+    total_tokens: int
+    unique_tokens: int
+    covered_tokens: int
+    difficulty_level: str
+    coverage_ratio: float
+    band_counts: dict[str, int]
+    rare_tokens: list[str]
+    covered_types: int
+    type_coverage_ratio: float
+    band_type_counts: dict[str, int]
+
+
+class TranscriptItem(BaseModel):
+    id: str = Field(..., max_length=64)
+    text: str
+
+
+class DifficultyBatchRequest(BaseModel):
+    items: list[TranscriptItem] = []
+    video_ids: list[str] = Field([], description="视频 ID，由服务端抓取字幕后分析")
+    profile: Optional[str] = Field(None, description="语域档案，默认使用服务端配置")
+
+
+class DifficultyBatchResult(BaseModel):
+    id: str
+    stats: DifficultyStats
+
+
+class DifficultyAggregate(BaseModel):
+    items: int
+    total_tokens: int
+    covered_tokens: int
+    coverage_ratio: float
+    mean_coverage_ratio: float
+    difficulty_level: str
+    band_counts: dict[str, int]
+    level_counts: dict[str, int]
+
+
+class VideoDifficultyRequest(BaseModel):
+    video_ids: list[str] = Field(..., min_length=1)
+
+
+class VideoDifficultyResult(BaseModel):
+    video_id: str
+    lexicon_version: str
+    stats: Optional[DifficultyStats] = None
+    error: Optional[str] = None
+
+
+class DifficultyBatchResponse(BaseModel):
+    lexicon_version: str
+    profile: str
+    items: list[DifficultyBatchResult]
+    videos: list[VideoDifficultyResult] = []
+    # 汇总所有字幕文本与成功分析的视频
+    aggregate: DifficultyAggregate
+
+
+class VideoDifficultyResponse(BaseModel):
+    items: list[VideoDifficultyResult]
+    aggregate: DifficultyAggregate
@@ -0,0 +1,123 @@
+"""批量难度分析
+
+多个字幕文本在进程池中并行分析。工作进程一律以 spawn 方式启动：服务进程中已有
+httpx、线程池与后台任务，fork 会把持有中的锁一起复制进子进程，可能导致死锁。
+词表在创建进程池时经 initializer 交给各工作进程，每个进程只接收一次（快照词表只传路径，重新映射同一文件）。
+词表热加载后进程池会被重建，保证工作进程使用最新版本。
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Iterable
+
+from ..config import settings
+from .difficulty import DifficultyAnalyzer, DifficultyStats
+from .lexicon import Lexicon, get_lexicon, set_lexicon
+
+logger = logging.getLogger(__name__)
+
+_worker_lexicon: Lexicon | None = None
+_worker_backend: str | None = None
+_worker_analyzers: dict[str | None, DifficultyAnalyzer] = {}
+
+
+def _init_worker(payload: tuple, backend: str | None) -> None:
+    global _worker_lexicon, _worker_backend
+    shared = Lexicon.from_payload(payload)
+    set_lexicon(shared)
+    _worker_lexicon = shared
+    _worker_backend = backend
+    _worker_analyzers.clear()
+
+
+def _analyse_in_worker(text: str, profile: str | None = None) -> DifficultyStats:
+    assert _worker_lexicon is not None
+    analyzer = _worker_analyzers.get(profile)
+    if analyzer is None:
+        analyzer = DifficultyAnalyzer(lexicon=_worker_lexicon, backend=_worker_backend, profile=profile)
+        _worker_analyzers[profile] = analyzer
+    return analyzer.analyse(text)
+
+
+class DifficultyPool:
+    def __init__(self, max_workers: int, min_parallel_items: int, backend: str | None = None):
+        self.max_workers = max_workers
+        self.min_parallel_items = min_parallel_items
+        self.backend = backend
+        self._executor: ProcessPoolExecutor | None = None
+        self._version: str | None = None
+        self._lock = threading.Lock()
+
+    def analyse_many(self, texts: list[str], profile: str | None = None) -> list[DifficultyStats]:
+        current = get_lexicon()
+        if len(texts) < self.min_parallel_items or self.max_workers <= 1:
+            analyzer = DifficultyAnalyzer(lexicon=current, backend=self.backend, profile=profile)
+            return [analyzer.analyse(text) for text in texts]
+
+        executor = self._get_executor(current)
+        chunksize = max(1, len(texts) // (self.max_workers * 4))
+        return list(
+            executor.map(_analyse_in_worker, texts, repeat(profile), chunksize=chunksize)
+        )
+
+    def _get_executor(self, current: Lexicon) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is not None and self._version != current.version:
+                logger.info("词表版本变化，重建难度分析进程池")
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(current.to_payload(), self.backend),
+                )
+                self._version = current.version
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def aggregate(stats: Iterable[DifficultyStats]) -> dict[str, Any]:
+    stats = list(stats)
+    total_tokens = sum(item.total_tokens for item in stats)
+    covered_tokens = sum(item.covered_tokens for item in stats)
+    band_counts: dict[str, int] = dict.fromkeys(DifficultyAnalyzer.BAND_KEYS, 0)
+    level_counts: dict[str, int] = {}
+    for item in stats:
+        for band, count in item.band_counts.items():
+            band_counts[band] += count
+        level_counts[item.difficulty_level] = level_counts.get(item.difficulty_level, 0) + 1
+
+    analysed = [item for item in stats if item.total_tokens]
+    coverage_ratio = covered_tokens / total_tokens if total_tokens else 0.0
+    return {
+        "items": len(stats),
+        "total_tokens": total_tokens,
+        "covered_tokens": covered_tokens,
+        "coverage_ratio": coverage_ratio,
+        "mean_coverage_ratio": (
+            sum(item.coverage_ratio for item in analysed) / len(analysed) if analysed else 0.0
+        ),
+        "difficulty_level": (
+            DifficultyAnalyzer.determine_level(coverage_ratio) if total_tokens else "Unknown"
+        ),
+        "band_counts": band_counts,
+        "level_counts": level_counts,
+    }
+
+
+difficulty_pool = DifficultyPool(
+    max_workers=settings.difficulty_pool_workers or os.cpu_count() or 1,
+    min_parallel_items=settings.difficulty_parallel_min_items,
+)
@@ -0,0 +1,202 @@
+"""进程内 TTL + LRU 缓存
+
+支持命中统计、并发相同未命中的合并（single-flight），以及可选的 SQLite 持久层，
+使缓存内容在后端重启后仍然可用。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+
+from ..database import SessionLocal
+from ..models import CacheEntry
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def make_key(*parts: Any) -> str:
+    """把若干参数序列化为稳定的缓存键。"""
+    return json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+
+
+class TTLCache:
+    """带过期时间的 LRU 缓存。
+
+    ``namespace`` 同时用作持久层中的分区名，``persistent=True`` 时会把条目写入
+    ``cache_entries`` 表，内存未命中时先回查数据库再请求上游。
+    """
+
+    def __init__(self, namespace: str, *, maxsize: int, ttl: float, persistent: bool = False):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.persistent = persistent
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """只查询内存层，并计入命中统计。"""
+        value = self._get_memory(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        self._set_memory(key, value, ttl)
+
+    def discard(self, key: str) -> None:
+        """移除内存层中的条目。"""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.persistent_hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "persistent": self.persistent,
+            "hits": self.hits,
+            "persistentHits": self.persistent_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hitRatio": (self.hits + self.persistent_hits) / lookups if lookups else 0.0,
+        }
+
+    def contains(self, key: str) -> bool:
+        """判断键是否在内存层且未过期，不计入命中统计。"""
+        return self._get_memory(key) is not _MISSING
+
+    def is_inflight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetcher: Callable[[], Awaitable[Any]],
+        *,
+        ttl: float | None = None,
+    ) -> Any:
+        """返回缓存值；未命中时调用 ``fetcher``，同一键的并发请求只触发一次上游调用。
+
+        ``ttl`` 仅作用于本次新写入的条目，默认使用缓存自身的过期时间。
+        """
+        value = self._get_memory(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._load(key, fetcher, ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield：单个调用方被取消时不影响其他等待同一结果的请求
+        return await asyncio.shield(task)
+
+    async def _load(
+        self, key: str, fetcher: Callable[[], Awaitable[Any]], ttl: float | None = None
+    ) -> Any:
+        if self.persistent:
+            try:
+                value, remaining = await asyncio.to_thread(self._db_get, key)
+            except Exception:
+                # 持久层不可用时按未命中处理，继续请求上游
+                logger.exception("读取持久缓存失败: %s", self.namespace)
+                value, remaining = _MISSING, 0.0
+            if value is not _MISSING:
+                self.persistent_hits += 1
+                self._set_memory(key, value, remaining)
+                return value
+
+        self.misses += 1
+        value = await fetcher()
+        self._set_memory(key, value, ttl)
+        if self.persistent:
+            try:
+                await asyncio.to_thread(self._db_set, key, value, self.ttl if ttl is None else ttl)
+            except Exception:
+                logger.exception("写入持久缓存失败: %s", self.namespace)
+        return value
+
+    def _get_memory(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_memory(self, key: str, value: Any, ttl: float | None = None) -> None:
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _db_get(self, key: str) -> tuple[Any, float]:
+        with SessionLocal() as session:
+            row = session.execute(
+                select(CacheEntry.value, CacheEntry.expires_at).where(
+                    CacheEntry.namespace == self.namespace,
+                    CacheEntry.key == key,
+                )
+            ).first()
+        if row is None:
+            return _MISSING, 0.0
+        remaining = (row.expires_at - datetime.utcnow()).total_seconds()
+        if remaining <= 0:
+            return _MISSING, 0.0
+        return json.loads(row.value), remaining
+
+    def _db_set(self, key: str, value: Any, ttl: float) -> None:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl)
+        stmt = insert(CacheEntry).values(
+            namespace=self.namespace,
+            key=key,
+            value=json.dumps(value, ensure_ascii=False),
+            expires_at=expires_at,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheEntry.namespace, CacheEntry.key],
+            set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+        )
+        with SessionLocal() as session:
+            session.execute(stmt)
+            session.execute(
+                delete(CacheEntry).where(
+                    CacheEntry.namespace == self.namespace,
+                    CacheEntry.expires_at <= now,
+                )
+            )
+            session.commit()
@@ -3,9 +3,13 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from threading import Event
+from typing import Any, Callable
 
 import yt_dlp
 
+from ..config import settings
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 DOWNLOAD_DIR = (BASE_DIR / "downloads").resolve()
 DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
@@ -15,6 +19,18 @@ class DownloadError(Exception):
     """自定义下载异常。"""
 
 
+class DownloadAborted(DownloadError):
+    """下载被主动中止。"""
+
+
+class DownloadCancelled(DownloadAborted):
+    """用户取消下载，未完成的文件应当清理。"""
+
+
+class DownloadInterrupted(DownloadAborted):
+    """服务停止导致下载中断，保留 .part 文件以便重启后续传。"""
+
+
 @dataclass(slots=True)
 class DownloadResult:
     video_id: str
@@ -37,27 +53,65 @@ class DownloadResult:
         }
 
 
+def resolve_format(format_code: str | None = None, audio_only: bool = False) -> str:
+    return "bestaudio/best" if audio_only else (format_code or "best")
+
+
 def download_video(
     video_id: str,
     format_code: str | None = None,
     audio_only: bool = False,
+    output_dir: Path | None = None,
+    concurrent_fragments: int | None = None,
+    info: dict[str, Any] | None = None,
+    progress_hook: Callable[[dict[str, Any]], None] | None = None,
+    postprocessor_hook: Callable[[dict[str, Any]], None] | None = None,
+    cancel_event: Event | None = None,
+    stop_event: Event | None = None,
 ) -> dict[str, str | int | None]:
     video_url = f"https://www.youtube.com/watch?v={video_id}"
 
-    selected_format = "bestaudio/best" if audio_only else (format_code or "best")
+    selected_format = resolve_format(format_code, audio_only)
 
     ydl_opts: dict[str, object] = {
         "format": selected_format,
-        "outtmpl": str(DOWNLOAD_DIR / "%(title)s-%(id)s.%(ext)s"),
+        "outtmpl": str((output_dir or DOWNLOAD_DIR) / "%(title)s-%(id)s.%(ext)s"),
         "noplaylist": True,
         "quiet": True,
         "no_warnings": True,
+        "noprogress": True,
+        "concurrent_fragment_downloads": concurrent_fragments or settings.download_concurrent_fragments,
+        # 保留 .part 文件并在下次下载同一目标时续传
+        "continuedl": True,
+        "nopart": False,
     }
 
+    def check_aborted(_: dict[str, Any]) -> None:
+        # yt-dlp 每写入一块数据都会回调，借此及时响应取消/停止
+        if (cancel_event is not None and cancel_event.is_set()) or (
+            stop_event is not None and stop_event.is_set()
+        ):
+            raise yt_dlp.utils.DownloadCancelled("下载已中止")  # type: ignore[attr-defined]
+
+    ydl_opts["progress_hooks"] = [check_aborted]
+    ydl_opts["postprocessor_hooks"] = [check_aborted]
+    if progress_hook is not None:
+        ydl_opts["progress_hooks"].append(progress_hook)
+    if postprocessor_hook is not None:
+        ydl_opts["postprocessor_hooks"].append(postprocessor_hook)
+
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(video_url, download=True)
+            if info is not None:
+                # 复用已提取的元数据，跳过重复的 extract_info
+                info = ydl.process_ie_result(info, download=True)
+            else:
+                info = ydl.extract_info(video_url, download=True)
             output_path = Path(ydl.prepare_filename(info))
+    except yt_dlp.utils.DownloadCancelled as exc:  # type: ignore[attr-defined]
+        if cancel_event is not None and cancel_event.is_set():
+            raise DownloadCancelled("下载已取消") from exc
+        raise DownloadInterrupted("下载被中断") from exc
     except yt_dlp.utils.DownloadError as exc:  # type: ignore[attr-defined]
         raise DownloadError(str(exc)) from exc
 
@@ -74,3 +128,21 @@ def download_video(
     )
 
     return result.to_dict()
+
+
+def expand_playlist(playlist_url: str) -> list[str]:
+    """只解析播放列表条目（不下载），返回其中的视频 ID。"""
+    ydl_opts: dict[str, object] = {
+        "extract_flat": "in_playlist",
+        "skip_download": True,
+        "quiet": True,
+        "no_warnings": True,
+    }
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(playlist_url, download=False)
+    except yt_dlp.utils.DownloadError as exc:  # type: ignore[attr-defined]
+        raise DownloadError(str(exc)) from exc
+
+    entries = info.get("entries") or []
+    return [entry["id"] for entry in entries if entry and entry.get("id")]
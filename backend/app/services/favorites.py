@@ -0,0 +1,160 @@
+"""收藏夹批量操作与导入导出
+
+批量添加/删除/移动都在一个事务内完成：插入依赖 ``(collection_id, video_id)`` 唯一索引
+配合 ``INSERT ... ON CONFLICT DO NOTHING`` 跳过重复，不再逐条查询。
+导出按 ``(added_at, id)`` 分块读取并逐块生成 JSON/CSV，内存占用与收藏数量无关。
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from typing import IO, Any, Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import Collection, FavoriteVideo
+from ..schemas import FavoriteVideoCreate
+
+EXPORT_FIELDS = ("video_id", "title", "channel_title", "thumbnail", "duration_iso8601", "added_at")
+_EXPORT_CHUNK = 500
+
+
+def add_favorites(db: Session, collection_id: int, items: Iterable[dict[str, Any]]) -> int:
+    """插入收藏，已存在的视频被跳过；返回实际新增的条数。调用方负责提交事务。"""
+    rows = [{**item, "collection_id": collection_id} for item in items]
+    if not rows:
+        return 0
+    now = datetime.utcnow()
+    for row in rows:
+        row.setdefault("added_at", now)
+    stmt = insert(FavoriteVideo.__table__).on_conflict_do_nothing(
+        index_elements=["collection_id", "video_id"]
+    )
+    return db.execute(stmt, rows).rowcount
+
+
+def remove_favorites(db: Session, collection_id: int, video_ids: list[str]) -> int:
+    result = db.execute(
+        delete(FavoriteVideo).where(
+            FavoriteVideo.collection_id == collection_id,
+            FavoriteVideo.video_id.in_(video_ids),
+        )
+    )
+    return result.rowcount
+
+
+def move_favorites(db: Session, source_id: int, target_id: int, video_ids: list[str]) -> tuple[int, int]:
+    """把收藏移到另一个收藏夹，保留原记录的 id 与添加时间。
+
+    目标收藏夹已有的视频只从源收藏夹删除。返回 ``(移动条数, 合并条数)``。
+    """
+    in_target = select(FavoriteVideo.video_id).where(FavoriteVideo.collection_id == target_id)
+    moved = db.execute(
+        update(FavoriteVideo)
+        .where(
+            FavoriteVideo.collection_id == source_id,
+            FavoriteVideo.video_id.in_(video_ids),
+            FavoriteVideo.video_id.not_in(in_target),
+        )
+        .values(collection_id=target_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    merged = remove_favorites(db, source_id, video_ids)
+    return moved, merged
+
+
+def iter_favorites(collection_id: int, chunk_size: int = _EXPORT_CHUNK) -> Iterator[FavoriteVideo]:
+    """按添加时间顺序分块读取，每块使用独立的短会话。"""
+    cursor = None
+    while True:
+        with SessionLocal() as db:
+            stmt = select(FavoriteVideo).where(FavoriteVideo.collection_id == collection_id)
+            if cursor is not None:
+                stmt = stmt.where(tuple_(FavoriteVideo.added_at, FavoriteVideo.id) > cursor)
+            stmt = stmt.order_by(FavoriteVideo.added_at, FavoriteVideo.id).limit(chunk_size)
+            chunk = db.scalars(stmt).all()
+        if not chunk:
+            return
+        yield from chunk
+        cursor = (chunk[-1].added_at, chunk[-1].id)
+
+
+def _export_row(favorite: FavoriteVideo) -> dict[str, Any]:
+    row = {field: getattr(favorite, field) for field in EXPORT_FIELDS}
+    row["added_at"] = favorite.added_at.isoformat() if favorite.added_at else None
+    return row
+
+
+def export_json(collection: Collection) -> Iterator[str]:
+    header = {"name": collection.name, "description": collection.description}
+    yield '{"collection":' + json.dumps(header, ensure_ascii=False) + ',"favorites":['
+    for index, favorite in enumerate(iter_favorites(collection.id)):
+        yield ("," if index else "") + json.dumps(_export_row(favorite), ensure_ascii=False)
+    yield "]}\n"
+
+
+def export_csv(collection: Collection) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for favorite in iter_favorites(collection.id):
+        writer.writerow(_export_row(favorite))
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def parse_import(fp: IO[bytes], fmt: str) -> tuple[dict[str, Any], Iterator[dict[str, Any]]]:
+    """解析导出文件，返回 ``(收藏夹信息, 收藏记录迭代器)``。CSV 逐行读取；JSON 需整体解析。"""
+    text = io.TextIOWrapper(fp, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        return {}, iter(csv.DictReader(text))
+    document = json.load(text)
+    if isinstance(document, list):
+        return {}, iter(document)
+    if not isinstance(document, dict):
+        raise ValueError("JSON 顶层应为对象或数组")
+    collection = document.get("collection") or {}
+    favorites = document.get("favorites") or []
+    if not isinstance(collection, dict):
+        raise ValueError("collection 应为对象")
+    if not isinstance(favorites, list):
+        raise ValueError("favorites 应为数组")
+    header = {key: collection[key] for key in ("name", "description") if isinstance(collection.get(key), str)}
+    return header, iter(favorites)
+
+
+def import_favorites(
+    db: Session, collection_id: int, records: Iterator[dict[str, Any]], chunk_size: int
+) -> tuple[int, int, int]:
+    """校验并分块写入导入的记录；返回 ``(新增, 重复, 无效)``。调用方负责提交事务。"""
+    added = duplicates = invalid = 0
+    while chunk := list(islice(records, chunk_size)):
+        rows = []
+        for record in chunk:
+            try:
+                item = FavoriteVideoCreate(**{k: v for k, v in record.items() if v not in ("", None)})
+            except (ValidationError, TypeError, AttributeError):
+                invalid += 1
+                continue
+            row = item.dict()
+            added_at = record.get("added_at")
+            if added_at:
+                try:
+                    row["added_at"] = datetime.fromisoformat(added_at)
+                except (TypeError, ValueError):
+                    pass
+            rows.append(row)
+        inserted = add_favorites(db, collection_id, rows)
+        added += inserted
+        duplicates += len(rows) - inserted
+    return added, duplicates, invalid
@@ -0,0 +1,282 @@
+"""下载任务队列
+
+POST 请求只负责写入 ``download_jobs`` 表并立即返回任务 ID，
+实际的 yt-dlp 下载由有界线程池执行；任务状态持久化在 SQLite 中，
+重启后未完成的任务会重新入队，并借助保留的 .part 文件断点续传。
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import select, update
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import DownloadJob, DownloadStatus
+from .download import DownloadCancelled, DownloadError, DownloadInterrupted
+from .progress import JobProgressReporter, ProgressBroker
+from .store import DownloadStore, download_store, make_store_key
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadJobManager:
+    def __init__(self, max_workers: int, broker: ProgressBroker, store: DownloadStore):
+        self.max_workers = max_workers
+        self.broker = broker
+        self.store = store
+        self._executor: ThreadPoolExecutor | None = None
+        self._cancel_events: dict[str, threading.Event] = {}
+        # 保证 cancel() 与 _run() 中“检查状态 → 写入状态 → 登记取消标志”不会交错
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        """创建线程池，并把上次未完成的任务重新入队。"""
+        if self._executor is not None:
+            return
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="download",
+        )
+
+        with SessionLocal() as db:
+            db.execute(
+                update(DownloadJob)
+                .where(DownloadJob.status == DownloadStatus.RUNNING)
+                .values(status=DownloadStatus.QUEUED)
+            )
+            db.commit()
+            job_ids = db.scalars(
+                select(DownloadJob.id)
+                .where(DownloadJob.status == DownloadStatus.QUEUED)
+                .order_by(DownloadJob.created_at)
+            ).all()
+
+        for job_id in job_ids:
+            self._dispatch(job_id)
+        if job_ids:
+            logger.info("恢复 %d 个未完成的下载任务", len(job_ids))
+
+    def shutdown(self) -> None:
+        """停止接收任务；正在进行的下载在下一个进度回调时中断，保留 .part 文件等待续传。"""
+        self._stopping.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def cancel(self, job_id: str) -> DownloadJob | None:
+        """取消任务：排队中的直接标记为已取消，运行中的由下载线程尽快中止并清理临时文件。"""
+        with self._lock, SessionLocal() as db:
+            job = db.get(DownloadJob, job_id)
+            if job is None:
+                return None
+            event = self._cancel_events.get(job_id)
+            if job.status == DownloadStatus.RUNNING and event is not None:
+                event.set()
+            elif job.status in (DownloadStatus.QUEUED, DownloadStatus.RUNNING):
+                job.status = DownloadStatus.CANCELLED
+                job.finished_at = datetime.utcnow()
+                db.commit()
+                self.broker.publish(job_id, {"status": "cancelled", "stage": "cancelled"}, force=True)
+            db.refresh(job)
+            db.expunge(job)
+            return job
+
+    def submit(
+        self,
+        video_id: str,
+        format_code: str | None = None,
+        audio_only: bool = False,
+        concurrent_fragments: int | None = None,
+    ) -> DownloadJob:
+        return self.submit_many(
+            [video_id],
+            format_code=format_code,
+            audio_only=audio_only,
+            concurrent_fragments=concurrent_fragments,
+        )[0]
+
+    def submit_many(
+        self,
+        video_ids: list[str],
+        format_code: str | None = None,
+        audio_only: bool = False,
+        concurrent_fragments: int | None = None,
+        batch_id: str | None = None,
+    ) -> list[DownloadJob]:
+        """在一个事务内为每个视频创建任务；并发度由线程池统一限制。"""
+        now = datetime.utcnow()
+        jobs: list[DownloadJob] = []
+        for video_id in video_ids:
+            # 已下载过的文件直接生成完成状态的任务，不再排队
+            cached = self.store.lookup(make_store_key(video_id, format_code, audio_only))
+            jobs.append(
+                DownloadJob(
+                    id=uuid.uuid4().hex,
+                    batch_id=batch_id,
+                    video_id=video_id,
+                    format_code=format_code,
+                    audio_only=audio_only,
+                    concurrent_fragments=concurrent_fragments,
+                    status=DownloadStatus.QUEUED if cached is None else DownloadStatus.COMPLETED,
+                    result=cached,
+                    created_at=now,
+                    started_at=None if cached is None else now,
+                    finished_at=None if cached is None else now,
+                )
+            )
+
+        with SessionLocal() as db:
+            db.add_all(jobs)
+            db.commit()
+            for job in jobs:
+                db.refresh(job)
+            db.expunge_all()
+
+        for job in jobs:
+            if job.status == DownloadStatus.QUEUED:
+                self._dispatch(job.id)
+        return jobs
+
+    def get(self, job_id: str) -> DownloadJob | None:
+        with SessionLocal() as db:
+            job = db.get(DownloadJob, job_id)
+            if job is not None:
+                db.expunge(job)
+            return job
+
+    def list(
+        self,
+        status: DownloadStatus | None = None,
+        batch_id: str | None = None,
+        limit: int | None = 50,
+    ) -> list[DownloadJob]:
+        stmt = select(DownloadJob).order_by(DownloadJob.created_at.desc())
+        if status is not None:
+            stmt = stmt.where(DownloadJob.status == status)
+        if batch_id is not None:
+            stmt = stmt.where(DownloadJob.batch_id == batch_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        with SessionLocal() as db:
+            jobs = list(db.scalars(stmt).all())
+            db.expunge_all()
+            return jobs
+
+    def _dispatch(self, job_id: str) -> None:
+        if self._executor is None:
+            raise RuntimeError("下载任务队列尚未启动")
+        self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str) -> None:
+        if self._stopping.is_set():
+            return
+        with self._lock, SessionLocal() as db:
+            job = db.get(DownloadJob, job_id)
+            if job is None or job.status != DownloadStatus.QUEUED:
+                return
+            # 先登记取消标志再写入 RUNNING，cancel() 看到运行中的任务时一定能找到它
+            cancel_event = self._cancel_events.setdefault(job_id, threading.Event())
+            job.status = DownloadStatus.RUNNING
+            job.attempts = (job.attempts or 0) + 1
+            job.started_at = job.started_at or datetime.utcnow()
+            db.commit()
+            video_id, format_code, audio_only = job.video_id, job.format_code, job.audio_only
+            concurrent_fragments = job.concurrent_fragments
+            resumed = job.attempts > 1
+
+        reporter = JobProgressReporter(self.broker, job_id)
+        self.broker.publish(
+            job_id,
+            {"status": "running", "stage": "resuming" if resumed else "starting"},
+            force=True,
+        )
+        last_saved = 0.0
+
+        def on_download(data: dict[str, Any]) -> None:
+            nonlocal last_saved
+            reporter.on_download(data)
+            now = time.monotonic()
+            if now - last_saved >= settings.download_progress_persist_interval:
+                last_saved = now
+                self._save_progress(
+                    job_id,
+                    data.get("downloaded_bytes"),
+                    data.get("total_bytes") or data.get("total_bytes_estimate"),
+                )
+
+        try:
+            result = self.store.fetch(
+                make_store_key(video_id, format_code, audio_only),
+                concurrent_fragments=concurrent_fragments,
+                progress_hook=on_download,
+                postprocessor_hook=reporter.on_postprocess,
+                cancel_event=cancel_event,
+                stop_event=self._stopping,
+            )
+        except DownloadCancelled:
+            self._finish(reporter, DownloadStatus.CANCELLED)
+        except DownloadInterrupted:
+            # 服务停止：回到排队状态，下次启动时续传
+            self._save_status(job_id, DownloadStatus.QUEUED)
+        except DownloadError as exc:
+            self._finish(reporter, DownloadStatus.FAILED, error=str(exc))
+        except Exception as exc:
+            logger.exception("下载任务 %s 异常退出", job_id)
+            self._finish(reporter, DownloadStatus.FAILED, error=str(exc))
+        else:
+            # 下载恰好在取消时完成：文件保留在仓库中，任务仍按用户的操作记为已取消
+            if cancel_event.is_set():
+                self._finish(reporter, DownloadStatus.CANCELLED)
+            else:
+                self._finish(reporter, DownloadStatus.COMPLETED, result=result)
+        finally:
+            with self._lock:
+                self._cancel_events.pop(job_id, None)
+
+    def _save_progress(self, job_id: str, downloaded: int | None, total: int | None) -> None:
+        with SessionLocal() as db:
+            db.execute(
+                update(DownloadJob)
+                .where(DownloadJob.id == job_id)
+                .values(downloaded_bytes=downloaded, total_bytes=total)
+            )
+            db.commit()
+
+    def _save_status(self, job_id: str, status: DownloadStatus) -> None:
+        with SessionLocal() as db:
+            db.execute(
+                update(DownloadJob)
+                .where(DownloadJob.id == job_id, DownloadJob.status != DownloadStatus.CANCELLED)
+                .values(status=status)
+            )
+            db.commit()
+
+    def _finish(self, reporter: JobProgressReporter, status: DownloadStatus, **fields: Any) -> None:
+        """写入终态；已被取消的任务不会被覆盖为其他状态。"""
+        job_id = reporter.job_id
+        with SessionLocal() as db:
+            updated = db.execute(
+                update(DownloadJob)
+                .where(DownloadJob.id == job_id, DownloadJob.status != DownloadStatus.CANCELLED)
+                .values(status=status, finished_at=datetime.utcnow(), **fields)
+            ).rowcount
+            db.commit()
+        if updated:
+            reporter.finish(status.value, **fields)
+
+
+progress_broker = ProgressBroker(min_interval=settings.download_progress_interval)
+job_manager = DownloadJobManager(
+    max_workers=settings.download_max_workers,
+    broker=progress_broker,
+    store=download_store,
+)
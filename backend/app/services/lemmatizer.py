@@ -0,0 +1,122 @@
+"""词形还原：屈折形式 → COCA 词元
+
+COCA 词表按词元（lemma）统计，字幕中的 "running"、"went"、"children" 需要先还原。
+映射表由 ``scripts/build_inflections.py`` 离线生成为 ``data/inflections.txt.gz``，
+每行 ``词元<TAB>形式 形式 ...``；词元一栏含空格时表示缩写展开（如 ``do not<TAB>don't``）。
+启动时一次性载入为字典，运行时每个词只做常数次查找，不依赖 NLP 库。
+"""
+from __future__ import annotations
+
+import gzip
+import logging
+import zlib
+from collections import Counter
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
+
+from ..config import DATA_DIR, settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_HEADER = "# ydl-inflections 1"
+
+DEFAULT_INDEX_PATH = DATA_DIR / "inflections.txt.gz"
+
+# 映射表中没有的缩写按后缀拆分，例如 "they'll" → they + will，"john's" → john
+CONTRACTION_SUFFIXES: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("n't", ("not",)),
+    ("'re", ("be",)),
+    ("'m", ("be",)),
+    ("'ll", ("will",)),
+    ("'ve", ("have",)),
+    ("'d", ("would",)),
+    # 's 可能是所有格或 is/has，无法区分时只保留前面的词
+    ("'s", ()),
+)
+
+
+class Lemmatizer:
+    def __init__(self, forms: Mapping[str, tuple[str, ...]], version: str = "none"):
+        self.forms = forms
+        # 映射文件内容的校验值，分析结果缓存以此区分不同版本的映射
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.forms)
+
+    def lemmatize(self, token: str) -> tuple[str, ...]:
+        lemmas = self.forms.get(token)
+        if lemmas is not None:
+            return lemmas
+        if "'" not in token:
+            return (token,)
+
+        # 正则会把引号一并匹配进来，例如 'hello'
+        stripped = token.strip("'")
+        if not stripped:
+            return ()
+        if stripped != token:
+            return self.lemmatize(stripped)
+        for suffix, expansion in CONTRACTION_SUFFIXES:
+            if token.endswith(suffix) and len(token) > len(suffix):
+                head = token[: -len(suffix)]
+                return self.forms.get(head, (head,)) + expansion
+        return (token,)
+
+    def lemmatize_counts(self, counts: Counter[str]) -> Counter[str]:
+        """把表层词频合并为词元词频；每个不同的词只还原一次。"""
+        if not self.forms:
+            return counts
+        forms_get = self.forms.get
+        lemmas: Counter[str] = Counter()
+        for token, count in counts.items():
+            if "'" not in token:
+                hit = forms_get(token)
+                if hit is None:
+                    lemmas[token] += count
+                    continue
+            else:
+                hit = self.lemmatize(token)
+            for lemma in hit:
+                lemmas[lemma] += count
+        return lemmas
+
+
+def read_index(path: Path) -> tuple[dict[str, tuple[str, ...]], str]:
+    """返回 ``(形式 -> 词元, 版本)``。"""
+    text = gzip.decompress(path.read_bytes()).decode("utf-8")
+    header, _, body = text.partition("\n")
+    if header != FORMAT_HEADER:
+        raise ValueError(f"不支持的词形映射文件格式: {header!r}")
+
+    forms: dict[str, tuple[str, ...]] = {}
+    for line in body.splitlines():
+        lemma_part, _, form_part = line.partition("\t")
+        lemmas = tuple(lemma_part.split(" "))
+        for form in form_part.split(" "):
+            if form:
+                forms[form] = lemmas
+    return forms, f"{zlib.crc32(body.encode('utf-8')):08x}"
+
+
+_current: Lemmatizer | None = None
+
+
+def load_lemmatizer(path: str | Path | None = None) -> Lemmatizer:
+    global _current
+    path = Path(path or settings.lemma_index_path or DEFAULT_INDEX_PATH)
+    try:
+        forms, version = read_index(path)
+    except FileNotFoundError:
+        logger.warning("未找到词形映射文件 %s，难度分析将不做词形还原", path)
+        forms, version = {}, "none"
+    _current = Lemmatizer(MappingProxyType(forms), version)
+    logger.info("词形映射已加载: %d 个形式 (版本 %s)", len(forms), version)
+    return _current
+
+
+def get_lemmatizer() -> Lemmatizer:
+    if _current is None:
+        return load_lemmatizer()
+    return _current
@@ -0,0 +1,276 @@
+"""进程级只读 COCA 词表
+
+启动时从 ``word_frequencies`` 一次性加载为 ``lemma -> rank`` 映射，
+所有 ``DifficultyAnalyzer`` 共享同一份数据，分析过程不再访问数据库。
+各语域（口语、影视、学术……）的频次按行存为紧凑数组，
+加载时预先算好每个语域档案的排名表，切换档案不需要额外计算。
+``scripts/import_coca.py`` 重新导入时会写入新的 ``lexicon_versions`` 记录，
+后台任务发现版本变化后整体替换词表。
+存在 ``data/lexicon.bin`` 快照且数据库没有更新的导入时，直接 mmap 快照而不查询词表。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from ..config import DATA_DIR, settings
+from ..database import SessionLocal
+from ..models import LexiconVersion, WordFrequency
+
+logger = logging.getLogger(__name__)
+
+# word_frequencies 中的语域列，顺序与 COCA CSV 一致
+GENRES: tuple[str, ...] = ("blog", "web", "tvm", "spok", "fic", "mag", "news", "acad")
+
+PROFILE_OVERALL = "overall"
+# 语域档案 → 参与排名的语域；多个语域时按每百万频次之和排名
+PROFILES: dict[str, tuple[str, ...]] = {
+    PROFILE_OVERALL: (),
+    "subtitle": ("tvm", "spok"),
+    "spoken": ("spok",),
+    "tvm": ("tvm",),
+    "fiction": ("fic",),
+    "magazine": ("mag",),
+    "news": ("news",),
+    "academic": ("acad",),
+    "web": ("web", "blog"),
+}
+
+_EMPTY: Mapping[Any, Any] = MappingProxyType({})
+
+
+class ArrayRanks(Mapping[str, int]):
+    """以 ``lemma -> 行号`` 加排名数组表示的只读映射，创建时不复制数据。"""
+
+    __slots__ = ("_rows", "_table")
+
+    def __init__(self, rows: Mapping[str, int], table: Sequence[int]):
+        self._rows = rows
+        self._table = table
+
+    def get(self, lemma: str, default: int | None = None) -> int | None:
+        row = self._rows.get(lemma)
+        return default if row is None else self._table[row]
+
+    def __getitem__(self, lemma: str) -> int:
+        return self._table[self._rows[lemma]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+@dataclass(frozen=True, slots=True)
+class Lexicon:
+    version: str
+    ranks: Mapping[str, int] = field(default_factory=lambda: _EMPTY)
+    # lemma -> 行号，行号索引下面的数组
+    rows: Mapping[str, int] = field(default_factory=lambda: _EMPTY)
+    genre_pm: Mapping[str, array] = field(default_factory=lambda: _EMPTY)
+    profile_ranks: Mapping[str, array] = field(default_factory=lambda: _EMPTY)
+    # 来自 mmap 快照时为文件路径
+    source: str | None = None
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    def rank(self, lemma: str) -> int | None:
+        return self.ranks.get(lemma)
+
+    def ranks_for(self, profile: str | None) -> Mapping[str, int]:
+        """返回指定语域档案的 ``lemma -> rank`` 映射。"""
+        if not profile or profile == PROFILE_OVERALL:
+            return self.ranks
+        if profile not in PROFILES:
+            raise ValueError(f"未知的语域档案: {profile}")
+        table = self.profile_ranks.get(profile)
+        if table is None:
+            # 旧数据没有语域列时退回总体排名
+            return self.ranks
+        return ArrayRanks(self.rows, table)
+
+    def to_payload(self) -> tuple:
+        """转换为可 pickle 的普通容器，供 spawn 模式的工作进程重建词表。
+
+        快照词表只传路径，工作进程重新映射同一文件，共享物理内存页。
+        """
+        if self.source is not None:
+            return (self.version, self.source)
+        return (
+            self.version,
+            dict(self.ranks),
+            dict(self.rows),
+            dict(self.genre_pm),
+            dict(self.profile_ranks),
+        )
+
+    @classmethod
+    def from_payload(cls, payload: tuple) -> Lexicon:
+        if len(payload) == 2:
+            from .lexicon_snapshot import open_snapshot
+
+            return open_snapshot(payload[1])
+        version, ranks, rows, genre_pm, profile_ranks = payload
+        return cls(
+            version=version,
+            ranks=MappingProxyType(ranks),
+            rows=MappingProxyType(rows),
+            genre_pm=MappingProxyType(genre_pm),
+            profile_ranks=MappingProxyType(profile_ranks),
+        )
+
+
+def build_lexicon(
+    version: str, records: Iterable[tuple[str, int, Sequence[float | None] | None]]
+) -> Lexicon:
+    """由 ``(lemma, rank, 各语域每百万频次)`` 构建词表并预计算各档案的排名表。"""
+    ordered = sorted(records, key=lambda record: record[1])
+    ranks = {lemma: rank for lemma, rank, _ in ordered}
+    rows = {lemma: row for row, (lemma, _, _) in enumerate(ordered)}
+    if not ordered or all(genres is None for _, _, genres in ordered):
+        return Lexicon(version=version, ranks=MappingProxyType(ranks), rows=MappingProxyType(rows))
+
+    genre_pm = {
+        genre: array("d", ((genres[i] if genres else None) or 0.0 for _, _, genres in ordered))
+        for i, genre in enumerate(GENRES)
+    }
+    profile_ranks = {}
+    for profile, genres in PROFILES.items():
+        if not genres:
+            continue
+        scores = [sum(values) for values in zip(*(genre_pm[genre] for genre in genres))]
+        # 频次相同时按总体排名，保证结果稳定
+        order = sorted(range(len(ordered)), key=lambda row: (-scores[row], row))
+        table = array("I", bytes(4 * len(ordered)))
+        for position, row in enumerate(order, start=1):
+            table[row] = position
+        profile_ranks[profile] = table
+
+    return Lexicon(
+        version=version,
+        ranks=MappingProxyType(ranks),
+        rows=MappingProxyType(rows),
+        genre_pm=MappingProxyType(genre_pm),
+        profile_ranks=MappingProxyType(profile_ranks),
+    )
+
+
+EMPTY_LEXICON = Lexicon(version="empty")
+
+DEFAULT_SNAPSHOT_PATH = DATA_DIR / "lexicon.bin"
+# 数据库中既没有版本记录也没有词条
+_EMPTY_DB_VERSION = "rows-0"
+
+_current: Lexicon | None = None
+
+
+def _current_version(db: Session) -> str:
+    version = db.scalar(
+        select(LexiconVersion.version).order_by(LexiconVersion.id.desc()).limit(1)
+    )
+    if version is not None:
+        return version
+    # 旧数据库没有版本记录时，用行数作为版本标识
+    return f"rows-{db.scalar(select(func.count(WordFrequency.id)))}"
+
+
+def _open_snapshot_for(version: str) -> Lexicon | None:
+    """数据库没有导入过词表，或最新导入就是快照的来源时，返回 mmap 快照。"""
+    from .lexicon_snapshot import SnapshotError, open_snapshot
+
+    path = Path(settings.lexicon_snapshot_path or DEFAULT_SNAPSHOT_PATH)
+    if not path.exists():
+        return None
+    try:
+        snapshot = open_snapshot(path)
+    except (OSError, SnapshotError):
+        logger.exception("词表快照 %s 无法使用，改为从数据库加载", path)
+        return None
+    if version == _EMPTY_DB_VERSION or snapshot.version == version:
+        return snapshot
+    return None
+
+
+def read_lexicon_records(db: Session) -> tuple[str, list[tuple[str, int, Sequence[float | None] | None]]]:
+    """从数据库读取 ``(版本, [(lemma, rank, 各语域每百万频次)])``。"""
+    version = _current_version(db)
+    genre_columns = [getattr(WordFrequency, f"{genre}_pm") for genre in GENRES]
+    try:
+        rows = db.execute(select(WordFrequency.lemma, WordFrequency.rank, *genre_columns)).all()
+        return version, [(row[0], row[1], row[2:]) for row in rows]
+    except OperationalError:
+        # 旧数据库还没有语域列，重新运行 import_coca.py 后即可使用语域档案
+        db.rollback()
+        rows = db.execute(select(WordFrequency.lemma, WordFrequency.rank)).all()
+        return version, [(lemma, rank, None) for lemma, rank in rows]
+
+
+def read_lexicon(db: Session | None = None) -> Lexicon:
+    """读取词表但不替换当前实例：优先映射快照，否则从数据库读取。"""
+    session = db or SessionLocal()
+    try:
+        snapshot = _open_snapshot_for(_current_version(session))
+        if snapshot is not None:
+            logger.info("词表快照已映射: %d 个词条 (版本 %s)", len(snapshot), snapshot.version)
+            return snapshot
+        version, records = read_lexicon_records(session)
+    finally:
+        if db is None:
+            session.close()
+
+    lexicon = build_lexicon(version, records)
+    logger.info("词表已加载: %d 个词条 (版本 %s)", len(lexicon), version)
+    return lexicon
+
+
+def load_lexicon(db: Session | None = None) -> Lexicon:
+    """加载词表并替换进程内的当前实例。"""
+    global _current
+    _current = read_lexicon(db)
+    return _current
+
+
+def set_lexicon(lexicon: Lexicon) -> None:
+    """直接替换当前词表（例如子进程接收父进程传入的词表）。"""
+    global _current
+    _current = lexicon
+
+
+def get_lexicon() -> Lexicon:
+    """返回当前词表；尚未加载（例如脚本中直接使用）时按需加载。"""
+    if _current is None:
+        return load_lexicon()
+    return _current
+
+
+def reload_if_changed() -> bool:
+    with SessionLocal() as db:
+        version = _current_version(db)
+        if _current is not None and (
+            _current.version == version
+            or (_current.source is not None and version == _EMPTY_DB_VERSION)
+        ):
+            return False
+        load_lexicon(db)
+    return True
+
+
+async def watch(interval: float) -> None:
+    """定期检查词表版本，发现重新导入后热加载。"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(reload_if_changed)
+        except Exception:
+            logger.exception("词表热加载失败")
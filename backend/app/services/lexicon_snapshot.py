@@ -0,0 +1,146 @@
+"""词表二进制快照
+
+``scripts/build_lexicon_snapshot.py`` 把 COCA 数据编译为 ``data/lexicon.bin``，
+运行时只读 mmap 映射：排名与频次数组直接引用映射的内存，多个工作进程共享同一份物理内存页；
+词元索引在打开时解码为字典（数万个词，耗时在毫秒级），分析时的查找保持 O(1)。
+
+文件布局（小端序）::
+
+    8 字节魔数 | uint32 格式版本 | uint32 元数据长度 | 元数据 JSON | 各数据段（8 字节对齐）
+
+元数据记录词表版本、词条数、语域/档案名称以及各数据段相对数据区起点的 ``[偏移, 长度]``。
+词元按 UTF-8 字节序排序存放在字符串段，``offsets`` 段为 ``uint32[n + 1]`` 的起止位置，
+其余数据段均为按同一行序排列的定长数组（排名 ``uint32``、每百万频次 ``float32``）。
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from types import MappingProxyType
+
+from .lexicon import ArrayRanks, Lexicon
+
+MAGIC = b"YDLLEX\x00\x00"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sII")
+_ALIGN = 8
+
+
+class SnapshotError(ValueError):
+    """快照文件损坏或格式不兼容。"""
+
+
+def write_snapshot(lexicon: Lexicon, path: str | Path) -> Path:
+    """把 ``build_lexicon`` 生成的词表写为快照文件（先写临时文件再原子替换）。"""
+    path = Path(path)
+    lemmas = sorted(lexicon.rows, key=lambda lemma: lemma.encode("utf-8"))
+    source_rows = [lexicon.rows[lemma] for lemma in lemmas]
+
+    encoded = [lemma.encode("utf-8") for lemma in lemmas]
+    offsets = array("I", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+
+    sections: dict[str, bytes] = {
+        "offsets": _le_bytes(offsets),
+        "strings": b"".join(encoded),
+        "ranks": _le_bytes(array("I", (lexicon.ranks[lemma] for lemma in lemmas))),
+    }
+    for genre, values in lexicon.genre_pm.items():
+        sections[f"genre:{genre}"] = _le_bytes(array("f", (values[row] for row in source_rows)))
+    for profile, table in lexicon.profile_ranks.items():
+        sections[f"profile:{profile}"] = _le_bytes(array("I", (table[row] for row in source_rows)))
+
+    layout: dict[str, list[int]] = {}
+    offset = 0
+    for name, data in sections.items():
+        offset = _aligned(offset)
+        layout[name] = [offset, len(data)]
+        offset += len(data)
+    meta_bytes = json.dumps(
+        {
+            "version": lexicon.version,
+            "count": len(lemmas),
+            "genres": list(lexicon.genre_pm),
+            "profiles": list(lexicon.profile_ranks),
+            "sections": layout,
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    data_start = _aligned(_HEADER.size + len(meta_bytes))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(meta_bytes)))
+        f.write(meta_bytes)
+        for name, data in sections.items():
+            f.write(b"\x00" * (data_start + layout[name][0] - f.tell()))
+            f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+def open_snapshot(path: str | Path) -> Lexicon:
+    """只读映射快照文件并返回共享其内存页的 ``Lexicon``。"""
+    if sys.byteorder != "little":
+        raise SnapshotError("快照为小端序格式，当前平台不支持直接映射")
+
+    path = Path(path)
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < _HEADER.size:
+        raise SnapshotError("快照文件过短")
+    magic, format_version, meta_len = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise SnapshotError(f"不支持的快照格式: {magic!r} v{format_version}")
+    meta = json.loads(buffer[_HEADER.size : _HEADER.size + meta_len])
+
+    view = memoryview(buffer)
+    sections = meta["sections"]
+    data_start = _aligned(_HEADER.size + meta_len)
+
+    def section(name: str, fmt: str) -> memoryview:
+        offset, length = sections[name]
+        offset += data_start
+        if offset + length > len(buffer):
+            raise SnapshotError(f"快照数据段越界: {name}")
+        return view[offset : offset + length].cast(fmt)
+
+    rows = _read_rows(buffer, data_start + sections["strings"][0], section("offsets", "I"))
+    if len(rows) != meta["count"]:
+        raise SnapshotError("快照词条数与元数据不符")
+
+    return Lexicon(
+        version=meta["version"],
+        ranks=ArrayRanks(rows, section("ranks", "I")),
+        rows=MappingProxyType(rows),
+        genre_pm=MappingProxyType({genre: section(f"genre:{genre}", "f") for genre in meta["genres"]}),
+        profile_ranks=MappingProxyType(
+            {profile: section(f"profile:{profile}", "I") for profile in meta["profiles"]}
+        ),
+        source=str(path),
+    )
+
+
+def _read_rows(buffer: mmap.mmap, base: int, offsets: memoryview) -> dict[str, int]:
+    """把字符串段解码为 ``lemma -> 行号`` 字典，保证每个词的查找都是一次字典访问。"""
+    raw = buffer[base : base + offsets[-1]]
+    return {raw[offsets[row] : offsets[row + 1]].decode("utf-8"): row for row in range(len(offsets) - 1)}
+
+
+def _le_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
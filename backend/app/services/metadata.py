@@ -0,0 +1,167 @@
+"""yt-dlp 元数据提取与格式列表
+
+``extract_info(download=False, process=False)`` 的结果经过 ``sanitize_info`` 清理、
+去掉与下载无关的大字段后压缩缓存；下载时直接复用缓存的 info，不再重复请求 YouTube。
+提取所用的 ``YoutubeDL`` 实例放在池中复用，避免每次构造的开销。
+"""
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import zlib
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import yt_dlp
+
+from ..config import settings
+from .cache import TTLCache
+from .download import DownloadError
+
+# 与下载/格式选择无关、却占据 info 大部分体积的字段
+_DROPPED_KEYS = ("automatic_captions", "heatmap", "thumbnails", "_format_sort_fields")
+
+
+def video_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+class YoutubeDLPool:
+    """固定上限的 ``YoutubeDL`` 实例池；实例非线程安全，借出期间独占使用。"""
+
+    def __init__(self, size: int, params: dict[str, Any]):
+        self.size = size
+        self.params = params
+        self._idle: queue.LifoQueue[yt_dlp.YoutubeDL] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self) -> Iterator[yt_dlp.YoutubeDL]:
+        ydl = self._take()
+        try:
+            yield ydl
+        finally:
+            self._idle.put(ydl)
+
+    def _take(self) -> yt_dlp.YoutubeDL:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return yt_dlp.YoutubeDL(dict(self.params))
+        return self._idle.get()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class MetadataService:
+    def __init__(self, pool: YoutubeDLPool, cache: TTLCache):
+        self.pool = pool
+        self.cache = cache
+        self._lock = threading.Lock()
+        # 正在提取的 video_id；并发的相同未命中共享一次 extract_info
+        self._inflight: dict[str, Future] = {}
+
+    def get_info(self, video_id: str) -> dict[str, Any]:
+        """返回未做格式选择的 info dict，优先读取缓存。"""
+        with self._lock:
+            packed = self.cache.get(video_id)
+            if packed is None:
+                future = self._inflight.get(video_id)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._inflight[video_id] = future
+        if packed is not None:
+            return json.loads(zlib.decompress(packed))
+        if not leader:
+            # 每个调用方各自解压一份，避免共享可变的 info dict
+            return json.loads(zlib.decompress(future.result()))
+
+        try:
+            info, packed = self._extract(video_id)
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(video_id, None)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self.cache.set(video_id, packed)
+            self._inflight.pop(video_id, None)
+        future.set_result(packed)
+        return info
+
+    def _extract(self, video_id: str) -> tuple[dict[str, Any], bytes]:
+        try:
+            with self.pool.acquire() as ydl:
+                raw = ydl.extract_info(video_url(video_id), download=False, process=False)
+                info = ydl.sanitize_info(raw)
+        except yt_dlp.utils.DownloadError as exc:  # type: ignore[attr-defined]
+            raise DownloadError(str(exc)) from exc
+
+        for key in _DROPPED_KEYS:
+            info.pop(key, None)
+        return info, zlib.compress(json.dumps(info, separators=(",", ":")).encode("utf-8"))
+
+    def invalidate(self, video_id: str) -> None:
+        with self._lock:
+            self.cache.discard(video_id)
+
+    def describe(self, video_id: str) -> dict[str, Any]:
+        info = self.get_info(video_id)
+        return {
+            "video_id": video_id,
+            "title": info.get("title"),
+            "channel": info.get("channel") or info.get("uploader"),
+            "duration": info.get("duration"),
+            "thumbnail": info.get("thumbnail"),
+            "upload_date": info.get("upload_date"),
+            "formats": [_summarize_format(fmt) for fmt in info.get("formats") or []],
+        }
+
+
+def _summarize_format(fmt: dict[str, Any]) -> dict[str, Any]:
+    vcodec = fmt.get("vcodec")
+    if fmt.get("width") and fmt.get("height"):
+        resolution = f"{fmt['width']}x{fmt['height']}"
+    elif vcodec == "none":
+        resolution = "audio only"
+    else:
+        resolution = fmt.get("resolution")
+    return {
+        "format_id": fmt.get("format_id"),
+        "ext": fmt.get("ext"),
+        "resolution": resolution,
+        "fps": fmt.get("fps"),
+        "vcodec": vcodec,
+        "acodec": fmt.get("acodec"),
+        "tbr": fmt.get("tbr"),
+        "filesize": fmt.get("filesize") or fmt.get("filesize_approx"),
+        "format_note": fmt.get("format_note"),
+    }
+
+
+ydl_pool = YoutubeDLPool(
+    settings.ytdlp_pool_size,
+    {"quiet": True, "no_warnings": True, "skip_download": True, "noplaylist": True},
+)
+
+metadata_service = MetadataService(
+    ydl_pool,
+    TTLCache(
+        "ytdlp_info",
+        maxsize=settings.ytdlp_info_cache_max_entries,
+        ttl=settings.ytdlp_info_cache_ttl,
+    ),
+)
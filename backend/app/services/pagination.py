@@ -0,0 +1,54 @@
+"""游标（keyset）分页
+
+游标是上一页最后一行排序键的编码，下一页用 ``(排序列, id) < (值, id)`` 继续读取，
+借助复合索引直接定位，不随页码增大而变慢，翻页期间有新增或删除也不会重复或漏行。
+"""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class InvalidCursor(ValueError):
+    """游标无法解析。"""
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    raw = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("无效的分页游标") from exc
+
+
+def paginate_desc(
+    stmt: Select,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    cursor: str | None,
+    limit: int,
+) -> Select:
+    """按 ``(sort_column, id) DESC`` 排序并从游标之后取 ``limit + 1`` 行（多取一行用于判断是否还有下一页）。"""
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+    return stmt.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int, key) -> tuple[list[Any], str | None]:
+    """截取一页并生成下一页游标；``key(row)`` 返回 ``(排序值, id)``。"""
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return items, None
+    return items, encode_cursor(*key(items[-1]))
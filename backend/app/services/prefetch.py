@@ -0,0 +1,97 @@
+"""搜索结果下一页的预取
+
+当前页返回后在后台抓取下一页并写入搜索缓存。预取受并发预算限制，
+超出预算直接放弃；写入的条目只保留较短的 TTL，未被使用即自然过期。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    def __init__(self, cache: TTLCache, *, ttl: float, concurrency: int):
+        self.cache = cache
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self._tasks: dict[str, asyncio.Task] = {}
+        # 预取完成的键及其过期定时器；重新预取或被使用时取消旧定时器
+        self._prefetched: dict[str, asyncio.TimerHandle] = {}
+        self.scheduled = 0
+        self.skipped = 0
+        self.completed = 0
+        self.failed = 0
+        self.used = 0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "ttl": self.ttl,
+            "concurrency": self.concurrency,
+            "running": len(self._tasks),
+            "scheduled": self.scheduled,
+            "skipped": self.skipped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "used": self.used,
+        }
+
+    async def schedule(self, key: str, fetcher: Callable[[], Awaitable[Any]]) -> None:
+        """在后台预取 ``key``；已缓存、正在请求或预算耗尽时跳过。"""
+        if key in self._tasks or self.cache.contains(key) or self.cache.is_inflight(key):
+            return
+        if len(self._tasks) >= self.concurrency:
+            self.skipped += 1
+            return
+
+        self.scheduled += 1
+        task = asyncio.ensure_future(self._run(key, fetcher))
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+    def mark_used(self, key: str, value: Any) -> bool:
+        """搜索请求命中预取结果时调用，把条目提升为常规 TTL。"""
+        if key not in self._prefetched:
+            return False
+        self._forget(key)
+        self.used += 1
+        self.cache.set(key, value)
+        return True
+
+    async def _run(self, key: str, fetcher: Callable[[], Awaitable[Any]]) -> None:
+        async def bounded_fetch() -> Any:
+            # 超过 TTL 仍未完成的预取直接取消，避免无谓消耗配额
+            return await asyncio.wait_for(fetcher(), timeout=self.ttl)
+
+        try:
+            await self.cache.get_or_fetch(key, bounded_fetch, ttl=self.ttl)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self.failed += 1
+            logger.info("预取失败: %s", exc)
+            return
+
+        self.completed += 1
+        self._forget(key)
+        # 未使用的预取记录随 TTL 一起失效，防止字典无限增长
+        self._prefetched[key] = asyncio.get_running_loop().call_later(
+            self.ttl, self._prefetched.pop, key, None
+        )
+
+    def _forget(self, key: str) -> None:
+        handle = self._prefetched.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+
+    def shutdown(self) -> None:
+        for task in list(self._tasks.values()):
+            task.cancel()
+        self._tasks.clear()
+        for handle in self._prefetched.values():
+            handle.cancel()
+        self._prefetched.clear()
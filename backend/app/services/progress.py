@@ -0,0 +1,148 @@
+"""下载进度事件通道
+
+yt-dlp 的 ``progress_hooks`` / ``postprocessor_hooks`` 在下载线程中回调，
+这里按任务节流后投递到事件循环；每个任务的通道只保留最新一条事件，
+订阅者（SSE 连接）读取时天然得到合并后的结果，不会被高频回调淹没。
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, AsyncIterator
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+
+class _Channel:
+    __slots__ = ("latest", "version", "changed")
+
+    def __init__(self) -> None:
+        self.latest: dict[str, Any] | None = None
+        self.version = 0
+        self.changed = asyncio.Event()
+
+
+class ProgressBroker:
+    def __init__(self, min_interval: float, retention: float = 60.0, id_field: str | None = "jobId"):
+        self.min_interval = min_interval
+        self.retention = retention
+        # 投递时把通道键写入事件的字段名；事件自带标识时传 None
+        self.id_field = id_field
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._channels: dict[str, _Channel] = {}
+        self._last_sent: dict[str, tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def publish(self, job_id: str, event: dict[str, Any], *, force: bool = False) -> None:
+        """可在任意线程调用。同一阶段内的事件按 ``min_interval`` 节流，阶段切换与终态总会发送。"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+
+        stage = event.get("stage") or event.get("status") or ""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_sent.get(job_id)
+            if (
+                not force
+                and last is not None
+                and last[1] == stage
+                and now - last[0] < self.min_interval
+            ):
+                return
+            self._last_sent[job_id] = (now, stage)
+
+        if self.id_field is not None:
+            event = {self.id_field: job_id, **event}
+        loop.call_soon_threadsafe(self._deliver, job_id, event)
+
+    def _deliver(self, job_id: str, event: dict[str, Any]) -> None:
+        channel = self._channels.setdefault(job_id, _Channel())
+        channel.latest = event
+        channel.version += 1
+        waiter, channel.changed = channel.changed, asyncio.Event()
+        waiter.set()
+
+        if event.get("status") in TERMINAL_STATUSES:
+            with self._lock:
+                self._last_sent.pop(job_id, None)
+            # 终态事件保留一段时间，供稍后连上的订阅者读取
+            asyncio.get_running_loop().call_later(self.retention, self._channels.pop, job_id, None)
+
+    async def subscribe(
+        self, job_id: str, heartbeat: float = 15.0
+    ) -> AsyncIterator[dict[str, Any] | None]:
+        """逐条产出最新事件；超过 ``heartbeat`` 秒没有新事件时产出 ``None``，收到终态后结束。"""
+        channel = self._channels.setdefault(job_id, _Channel())
+        seen = 0
+        while True:
+            if channel.version != seen:
+                seen = channel.version
+                event = channel.latest
+                yield event
+                if event is not None and event.get("status") in TERMINAL_STATUSES:
+                    return
+                continue
+            try:
+                await asyncio.wait_for(channel.changed.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+
+class JobProgressReporter:
+    """把 yt-dlp 的回调字典转换为统一的进度事件。"""
+
+    def __init__(self, broker: ProgressBroker, job_id: str):
+        self.broker = broker
+        self.job_id = job_id
+
+    def on_download(self, data: dict[str, Any]) -> None:
+        status = data.get("status")
+        if status == "downloading":
+            downloaded = data.get("downloaded_bytes")
+            total = data.get("total_bytes") or data.get("total_bytes_estimate")
+            self.broker.publish(
+                self.job_id,
+                {
+                    "status": "running",
+                    "stage": "downloading",
+                    "downloadedBytes": downloaded,
+                    "totalBytes": total,
+                    "percent": round(downloaded / total * 100, 1) if downloaded and total else None,
+                    "speed": data.get("speed"),
+                    "eta": data.get("eta"),
+                    "filename": data.get("filename"),
+                },
+            )
+        elif status == "finished":
+            self.broker.publish(
+                self.job_id,
+                {
+                    "status": "running",
+                    "stage": "downloaded",
+                    "downloadedBytes": data.get("downloaded_bytes") or data.get("total_bytes"),
+                    "totalBytes": data.get("total_bytes"),
+                    "percent": 100.0,
+                    "filename": data.get("filename"),
+                },
+                force=True,
+            )
+
+    def on_postprocess(self, data: dict[str, Any]) -> None:
+        self.broker.publish(
+            self.job_id,
+            {
+                "status": "running",
+                "stage": "postprocessing",
+                "postprocessor": data.get("postprocessor"),
+                "postprocessorStatus": data.get("status"),
+            },
+            force=data.get("status") != "processing",
+        )
+
+    def finish(self, status: str, **fields: Any) -> None:
+        self.broker.publish(self.job_id, {"status": status, "stage": status, **fields}, force=True)
@@ -0,0 +1,280 @@
+"""按 (video_id, 格式, 仅音频) 寻址的下载文件仓库
+
+每个键对应 ``DOWNLOAD_DIR`` 下一个以键哈希命名的目录，索引保存在 ``downloaded_files`` 表：
+重复请求直接返回已有文件，同一键的并发下载只执行一次，
+总占用超过配额时按最近访问时间淘汰最久未用的文件。
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import shutil
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import DownloadedFile
+from .download import (
+    DOWNLOAD_DIR,
+    DownloadAborted,
+    DownloadCancelled,
+    DownloadError,
+    download_video,
+    resolve_format,
+)
+from .metadata import MetadataService, metadata_service
+
+logger = logging.getLogger(__name__)
+
+StoreKey = tuple[str, str, bool]
+
+# 等待共享下载时检查取消标志的间隔（秒）
+_FOLLOWER_POLL_INTERVAL = 0.5
+
+# 缓存的 info 已失效时 yt-dlp 报告的错误：媒体地址过期（403/410）或格式已不存在，
+# 只有这些错误值得重新提取后重试
+_STALE_INFO_ERRORS = re.compile(
+    r"HTTP Error (?:403|410)|format is not available",
+    re.IGNORECASE,
+)
+
+
+def make_store_key(video_id: str, format_code: str | None, audio_only: bool) -> StoreKey:
+    return video_id, resolve_format(format_code, audio_only), audio_only
+
+
+def storage_key(key: StoreKey) -> str:
+    video_id, format_selector, audio_only = key
+    raw = f"{video_id}\x1f{format_selector}\x1f{int(audio_only)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _row_to_result(row: DownloadedFile) -> dict[str, Any]:
+    return {
+        "video_id": row.video_id,
+        "title": row.title or "",
+        "filepath": row.filepath,
+        "filesize": row.filesize,
+        "ext": row.ext,
+        "duration": row.duration,
+        "downloaded_at": row.created_at.isoformat(),
+        "file_id": row.storage_key,
+    }
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class DownloadStore:
+    def __init__(self, root: Path, quota_bytes: int, metadata: MetadataService):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.metadata = metadata
+        self._inflight: dict[StoreKey, Future] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key: StoreKey) -> dict[str, Any] | None:
+        """命中且文件仍在磁盘上时返回下载结果，并刷新最近访问时间。"""
+        video_id, format_selector, audio_only = key
+        with SessionLocal() as db:
+            row = db.scalars(
+                select(DownloadedFile).where(
+                    DownloadedFile.video_id == video_id,
+                    DownloadedFile.format_selector == format_selector,
+                    DownloadedFile.audio_only == audio_only,
+                )
+            ).first()
+            if row is None:
+                return None
+            if not Path(row.filepath).exists():
+                # 文件被手动删除，索引失效
+                db.delete(row)
+                db.commit()
+                return None
+            row.last_accessed_at = datetime.utcnow()
+            db.commit()
+            return _row_to_result(row)
+
+    def get_file(self, file_id: str) -> Path | None:
+        """按 ``file_id`` 返回仓库内的文件路径，并刷新最近访问时间。"""
+        with SessionLocal() as db:
+            row = db.scalars(
+                select(DownloadedFile).where(DownloadedFile.storage_key == file_id)
+            ).first()
+            if row is None:
+                return None
+            path = Path(row.filepath).resolve()
+            # 只允许访问仓库目录内的文件
+            if not path.is_relative_to(self.root.resolve()) or not path.is_file():
+                return None
+            row.last_accessed_at = datetime.utcnow()
+            db.commit()
+            return path
+
+    def fetch(self, key: StoreKey, **download_kwargs: Any) -> dict[str, Any]:
+        """返回已有文件，否则下载；同一键的并发调用共享一次下载。"""
+        cancel_event = download_kwargs.get("cancel_event")
+        while True:
+            cached = self.lookup(key)
+            if cached is not None:
+                return cached
+
+            with self._lock:
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._inflight[key] = future
+
+            if leader:
+                break
+            try:
+                return self._wait_shared(future, cancel_event)
+            except DownloadCancelled:
+                # 共享的下载被其他任务取消，自己未被取消时重新尝试
+                if cancel_event is not None and cancel_event.is_set():
+                    raise
+
+        try:
+            result = self._download(key, **download_kwargs)
+        except BaseException as exc:
+            if isinstance(exc, DownloadCancelled):
+                self.discard_partial(key)
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    @staticmethod
+    def _wait_shared(future: Future, cancel_event: threading.Event | None) -> dict[str, Any]:
+        """等待其他任务的下载结果；自己被取消时立即退出，不影响共享的下载。"""
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise DownloadCancelled("下载已取消")
+            try:
+                return future.result(timeout=_FOLLOWER_POLL_INTERVAL)
+            except FutureTimeout:
+                continue
+
+    def discard_partial(self, key: StoreKey) -> None:
+        """删除未完成下载留下的目录（.part、分片等），已入库的文件不受影响。"""
+        digest = storage_key(key)
+        with SessionLocal() as db:
+            indexed = db.scalar(
+                select(func.count(DownloadedFile.id)).where(DownloadedFile.storage_key == digest)
+            )
+        if not indexed:
+            shutil.rmtree(self.root / digest, ignore_errors=True)
+
+    def _download(self, key: StoreKey, **download_kwargs: Any) -> dict[str, Any]:
+        video_id, format_selector, audio_only = key
+        digest = storage_key(key)
+        target_dir = self.root / digest
+        target_dir.mkdir(parents=True, exist_ok=True)
+
+        info = self.metadata.get_info(video_id)
+        try:
+            result = download_video(
+                video_id=video_id,
+                format_code=format_selector,
+                audio_only=audio_only,
+                output_dir=target_dir,
+                info=info,
+                **download_kwargs,
+            )
+        except DownloadAborted:
+            raise
+        except DownloadError as exc:
+            if not _STALE_INFO_ERRORS.search(str(exc)):
+                raise
+            # 缓存中的媒体地址已过期，重新提取后再试一次
+            logger.info("媒体地址失效，重新提取 %s: %s", video_id, exc)
+            self.metadata.invalidate(video_id)
+            result = download_video(
+                video_id=video_id,
+                format_code=format_selector,
+                audio_only=audio_only,
+                output_dir=target_dir,
+                **download_kwargs,
+            )
+        filesize = result.get("filesize") or _dir_size(target_dir)
+
+        stmt = insert(DownloadedFile).values(
+            video_id=video_id,
+            format_selector=format_selector,
+            audio_only=audio_only,
+            storage_key=digest,
+            filepath=result["filepath"],
+            filesize=filesize,
+            title=result.get("title"),
+            ext=result.get("ext"),
+            duration=result.get("duration"),
+            created_at=datetime.utcnow(),
+            last_accessed_at=datetime.utcnow(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DownloadedFile.storage_key],
+            set_={
+                "filepath": stmt.excluded.filepath,
+                "filesize": stmt.excluded.filesize,
+                "title": stmt.excluded.title,
+                "ext": stmt.excluded.ext,
+                "duration": stmt.excluded.duration,
+                "last_accessed_at": stmt.excluded.last_accessed_at,
+            },
+        )
+        with SessionLocal() as db:
+            db.execute(stmt)
+            db.commit()
+
+        self.enforce_quota(keep={digest})
+        return {**result, "file_id": digest}
+
+    def usage(self) -> int:
+        with SessionLocal() as db:
+            return db.scalar(select(func.coalesce(func.sum(DownloadedFile.filesize), 0)))
+
+    def enforce_quota(self, keep: set[str] | None = None) -> int:
+        """淘汰最久未访问的文件直到总占用不超过配额，返回释放的字节数。"""
+        if self.quota_bytes <= 0:
+            return 0
+
+        freed = 0
+        with SessionLocal() as db:
+            used = db.scalar(select(func.coalesce(func.sum(DownloadedFile.filesize), 0)))
+            if used <= self.quota_bytes:
+                return 0
+            rows = db.scalars(
+                select(DownloadedFile).order_by(DownloadedFile.last_accessed_at)
+            ).all()
+            for row in rows:
+                if used - freed <= self.quota_bytes:
+                    break
+                if keep and row.storage_key in keep:
+                    continue
+                shutil.rmtree(self.root / row.storage_key, ignore_errors=True)
+                freed += row.filesize or 0
+                logger.info("磁盘配额已满，淘汰 %s (%s)", row.video_id, row.format_selector)
+                db.delete(row)
+            db.commit()
+        return freed
+
+
+download_store = DownloadStore(
+    DOWNLOAD_DIR,
+    quota_bytes=settings.download_quota_bytes,
+    metadata=metadata_service,
+)
@@ -0,0 +1,343 @@
+"""字幕抓取 → 难度分析流水线
+
+通过 yt-dlp 只下载字幕（人工字幕优先，其次自动字幕），逐行流式解析 VTT/SRT，
+分析结果按 (video_id, 词表版本) 存入 ``video_difficulties``，再次查询只需一次索引读取。
+"""
+from __future__ import annotations
+
+import html
+import logging
+import re
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+import yt_dlp
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import VideoDifficulty
+from .analysis import DifficultyPool, difficulty_pool
+from .cache import TTLCache
+from .difficulty import DifficultyAnalyzer
+from .download import DownloadError
+from .lemmatizer import Lemmatizer, get_lemmatizer
+from .lexicon import Lexicon, get_lexicon
+from .metadata import video_url
+from .progress import ProgressBroker
+
+logger = logging.getLogger(__name__)
+
+_TAG_PATTERN = re.compile(r"<[^>]*>")
+_HEADER_PREFIXES = ("WEBVTT", "Kind:", "Language:")
+_SKIPPED_BLOCKS = ("NOTE", "STYLE", "REGION")
+
+# 视频难度状态，搜索结果、轮询接口与 SSE 事件共用
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_PENDING = "pending"
+# 没有缓存结果也不在后台队列中（例如队列已满），稍后可重新查询
+STATUS_MISSING = "missing"
+
+
+class SubtitlesUnavailable(DownloadError):
+    """视频没有可用的字幕，或视频本身不可访问；结果会写入缓存表，不再重复抓取。"""
+
+
+# yt-dlp 报告的永久性错误（私享、已删除、会员专属等），重试也不会成功
+_PERMANENT_ERRORS = re.compile(
+    r"private video|video unavailable|video is (?:unavailable|not available)|has been removed"
+    r"|members-only|account associated with this video has been terminated",
+    re.IGNORECASE,
+)
+
+
+def analysis_version(
+    lexicon: Lexicon | None = None, lemmatizer: Lemmatizer | None = None, profile: str | None = None
+) -> str:
+    """分析结果的缓存版本：词表、词形映射或语域档案任一变化都需要重新分析。"""
+    lexicon = lexicon or get_lexicon()
+    lemmatizer = lemmatizer or get_lemmatizer()
+    return f"{lexicon.version}/{lemmatizer.version}/{profile or settings.difficulty_profile}"
+
+
+def iter_cue_lines(lines: Iterable[str], auto_generated: bool = False) -> Iterator[str]:
+    """从 VTT/SRT 行流中产出字幕文本行，跳过头部、序号、时间轴与样式块。
+
+    纯数字行只有位于块首且紧跟时间轴时才视为 SRT 序号（或 VTT cue 标识），
+    字幕正文中的 "1984" 之类会保留。YouTube 自动字幕的相邻 cue 会重复上一句，
+    ``auto_generated`` 时再去掉与最近两行相同的行；人工字幕中有意重复的台词不受影响。
+    """
+    recent: deque[str] = deque(maxlen=2)
+
+    def accept(text: str) -> bool:
+        if not text:
+            return False
+        if auto_generated:
+            if text in recent:
+                return False
+            recent.append(text)
+        return True
+
+    skipping_block = False
+    block_start = True
+    # 块首的纯数字行，读到下一行后才能确定是不是序号
+    held: str | None = None
+    for raw in lines:
+        line = raw.strip().lstrip("\ufeff")
+        if held is not None:
+            candidate, held = held, None
+            if "-->" not in line and accept(candidate):
+                yield candidate
+        if not line:
+            skipping_block = False
+            block_start = True
+            continue
+        at_block_start, block_start = block_start, False
+        if skipping_block:
+            continue
+        if line.startswith(_SKIPPED_BLOCKS):
+            skipping_block = True
+            continue
+        if line.startswith(_HEADER_PREFIXES) or "-->" in line:
+            continue
+        if at_block_start and line.isdigit():
+            held = line
+            continue
+
+        text = html.unescape(_TAG_PATTERN.sub("", line)).strip()
+        if accept(text):
+            yield text
+    if held is not None and accept(held):
+        yield held
+
+
+class SubtitleDifficultyPipeline:
+    def __init__(
+        self,
+        language: str,
+        max_workers: int,
+        broker: ProgressBroker,
+        max_queued: int,
+        failure_ttl: float,
+        pool: DifficultyPool,
+    ):
+        self.language = language
+        self.broker = broker
+        # 批量分析在进程池中进行，字幕抓取仍使用本地线程池
+        self.pool = pool
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="subtitles")
+        self._pending: set[str] = set()
+        # 网络等临时错误不写入缓存表，只在内存中记住一段时间，避免每次搜索都重新抓取
+        self._failures = TTLCache("subtitle-failures", maxsize=max(max_queued * 10, 1000), ttl=failure_ttl)
+        self._lock = threading.Lock()
+
+    def fetch_subtitle_file(self, video_id: str, workdir: Path) -> tuple[Path, bool]:
+        """下载字幕文件，返回 ``(路径, 是否为自动字幕)``。"""
+        ydl_opts: dict[str, object] = {
+            "skip_download": True,
+            "writesubtitles": True,
+            "writeautomaticsub": True,
+            "subtitleslangs": [self.language, f"{self.language}-.*"],
+            "subtitlesformat": "vtt/srt/best",
+            "outtmpl": str(workdir / "%(id)s.%(ext)s"),
+            "noplaylist": True,
+            "quiet": True,
+            "no_warnings": True,
+        }
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(video_url(video_id), download=True) or {}
+        except yt_dlp.utils.DownloadError as exc:  # type: ignore[attr-defined]
+            if _PERMANENT_ERRORS.search(str(exc)):
+                raise SubtitlesUnavailable(str(exc)) from exc
+            raise DownloadError(str(exc)) from exc
+
+        candidates = sorted(workdir.glob(f"{video_id}.*.vtt")) + sorted(workdir.glob(f"{video_id}.*.srt"))
+        if not candidates:
+            raise SubtitlesUnavailable(f"该视频没有可用的 {self.language} 字幕")
+        path = candidates[0]
+        # 文件名形如 <id>.<语言>.vtt；人工字幕表中没有该语言时即为自动字幕
+        language = path.name[len(video_id) + 1 :].rsplit(".", 1)[0]
+        return path, language not in (info.get("subtitles") or {})
+
+    def analyse_video(self, video_id: str) -> dict[str, Any]:
+        """抓取并分析单个视频，结果写入缓存表；已缓存时直接返回。"""
+        lexicon = get_lexicon()
+        lemmatizer = get_lemmatizer()
+        version = analysis_version(lexicon, lemmatizer)
+        cached = self.lookup([video_id], version).get(video_id)
+        if cached is not None:
+            return cached
+
+        analyzer = DifficultyAnalyzer(lexicon=lexicon, lemmatizer=lemmatizer)
+        accumulator = analyzer.accumulator()
+        failure = self._read_cues(video_id, version, accumulator.add_cue)
+        if failure is not None:
+            return failure
+        stats = accumulator.finish()
+        self._store(video_id, version, stats, None)
+        return self._to_result(video_id, version, asdict(stats), None)
+
+    def analyse_videos(
+        self, video_ids: list[str], profile: str | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """批量分析：先一次查询缓存，未命中的视频在线程池中并发抓取字幕，再交给进程池统一分析。"""
+        profile = profile or settings.difficulty_profile
+        version = analysis_version(profile=profile)
+        video_ids = list(dict.fromkeys(video_ids))
+        results = self.lookup(video_ids, version)
+        misses = [video_id for video_id in video_ids if video_id not in results]
+
+        transcripts: dict[str, str] = {}
+        for video_id, fetched in zip(misses, self._executor.map(self._fetch_transcript, misses, repeat(version))):
+            if isinstance(fetched, str):
+                transcripts[video_id] = fetched
+            else:
+                results[video_id] = fetched
+        if transcripts:
+            stats = self.pool.analyse_many(list(transcripts.values()), profile)
+            for video_id, item in zip(transcripts, stats):
+                self._store(video_id, version, item, None)
+                results[video_id] = self._to_result(video_id, version, asdict(item), None)
+        return results
+
+    def _fetch_transcript(self, video_id: str, version: str) -> str | dict[str, Any]:
+        """返回字幕全文（按行拼接）；失败时返回失败结果。"""
+        lines: list[str] = []
+        failure = self._read_cues(video_id, version, lines.append)
+        return failure if failure is not None else "\n".join(lines)
+
+    def _read_cues(
+        self, video_id: str, version: str, on_line: Callable[[str], None]
+    ) -> dict[str, Any] | None:
+        """抓取字幕并逐行回调；失败时返回失败结果（永久性失败写入缓存表，临时失败记入内存）。"""
+        try:
+            with tempfile.TemporaryDirectory(prefix="ydl-subs-") as tmp:
+                path, auto_generated = self.fetch_subtitle_file(video_id, Path(tmp))
+                with path.open("r", encoding="utf-8", errors="replace") as f:
+                    for line in iter_cue_lines(f, auto_generated):
+                        on_line(line)
+        except SubtitlesUnavailable as exc:
+            self._store(video_id, version, None, str(exc))
+            return self._to_result(video_id, version, None, str(exc))
+        except DownloadError as exc:
+            # 网络等临时错误不写入缓存表，过期后仍会重试
+            logger.warning("抓取字幕失败 %s: %s", video_id, exc)
+            result = self._to_result(video_id, version, None, str(exc))
+            with self._lock:
+                self._failures.set(video_id, result)
+            return result
+        return None
+
+    def schedule(self, video_ids: Iterable[str]) -> list[str]:
+        """在后台排队分析，不等待结果；返回本次新排队的视频。
+
+        已在队列中或近期失败过的视频不会重复提交；队列达到 ``max_queued`` 后其余视频不再排队。
+        """
+        queued = []
+        with self._lock:
+            for video_id in video_ids:
+                if len(self._pending) >= self.max_queued:
+                    break
+                if video_id in self._pending or self._failures.contains(video_id):
+                    continue
+                self._pending.add(video_id)
+                queued.append(video_id)
+        for video_id in queued:
+            self._executor.submit(self._analyse_in_background, video_id)
+        return queued
+
+    def is_pending(self, video_id: str) -> bool:
+        return video_id in self._pending
+
+    def status(self, video_id: str, result: dict[str, Any] | None) -> str:
+        """返回 ``STATUS_*`` 之一；``result`` 为 ``lookup`` 的结果。"""
+        if result is not None:
+            return STATUS_COMPLETED if result["stats"] is not None else STATUS_FAILED
+        return STATUS_PENDING if self.is_pending(video_id) else STATUS_MISSING
+
+    def _analyse_in_background(self, video_id: str) -> None:
+        try:
+            result = self.analyse_video(video_id)
+        except Exception as exc:  # noqa: BLE001 - 后台任务不能让异常丢失在线程池里
+            logger.exception("后台分析字幕难度失败 %s", video_id)
+            result = self._to_result(video_id, analysis_version(), None, str(exc))
+        finally:
+            with self._lock:
+                self._pending.discard(video_id)
+        self.broker.publish(video_id, {"status": self.status(video_id, result), **result}, force=True)
+
+    def lookup(
+        self, video_ids: list[str], lexicon_version: str | None = None
+    ) -> dict[str, dict[str, Any]]:
+        if not video_ids:
+            return {}
+        lexicon_version = lexicon_version or analysis_version()
+        with SessionLocal() as db:
+            rows = db.scalars(
+                select(VideoDifficulty).where(
+                    VideoDifficulty.lexicon_version == lexicon_version,
+                    VideoDifficulty.video_id.in_(video_ids),
+                )
+            ).all()
+        results = {
+            row.video_id: self._to_result(row.video_id, row.lexicon_version, row.stats, row.error)
+            for row in rows
+        }
+        with self._lock:
+            for video_id in video_ids:
+                failure = self._failures.get(video_id) if video_id not in results else None
+                if failure is not None and failure["lexicon_version"] == lexicon_version:
+                    results[video_id] = failure
+        return results
+
+    def _store(self, video_id: str, lexicon_version: str, stats, error: str | None) -> None:
+        stmt = insert(VideoDifficulty).values(
+            video_id=video_id,
+            lexicon_version=lexicon_version,
+            language=self.language,
+            difficulty_level=stats.difficulty_level if stats else None,
+            coverage_ratio=stats.coverage_ratio if stats else None,
+            stats=asdict(stats) if stats else None,
+            error=error,
+        )
+        stmt = stmt.on_conflict_do_nothing(index_elements=["video_id", "lexicon_version"])
+        with SessionLocal() as db:
+            db.execute(stmt)
+            db.commit()
+
+    @staticmethod
+    def _to_result(
+        video_id: str, lexicon_version: str, stats: dict[str, Any] | None, error: str | None
+    ) -> dict[str, Any]:
+        return {
+            "video_id": video_id,
+            "lexicon_version": lexicon_version,
+            "stats": stats,
+            "error": error,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 后台分析完成时按 video_id 推送结果，供搜索结果的难度标记订阅；事件本身带有 video_id
+difficulty_events = ProgressBroker(min_interval=0, id_field=None)
+
+subtitle_pipeline = SubtitleDifficultyPipeline(
+    language=settings.subtitle_language,
+    max_workers=settings.subtitle_max_workers,
+    broker=difficulty_events,
+    max_queued=settings.subtitle_queue_max_items,
+    failure_ttl=settings.subtitle_failure_ttl,
+    pool=difficulty_pool,
+)
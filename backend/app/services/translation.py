@@ -0,0 +1,121 @@
+"""搜索关键词翻译服务
+
+语言检测与翻译结果按 (keyword, target_lang) 缓存在内存并持久化到应用数据库；
+未命中时在线程池中执行并设置超时，避免阻塞事件循环。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from deep_translator import GoogleTranslator
+from langdetect import DetectorFactory, LangDetectException, detect
+
+from ..config import settings
+from .cache import TTLCache, make_key
+
+logger = logging.getLogger(__name__)
+
+# 固定随机种子，保证同一关键词的检测结果稳定，缓存才有意义
+DetectorFactory.seed = 0
+
+LANGUAGE_ALIAS: dict[str, str] = {
+    "zh": "zh-cn",
+    "zh-cn": "zh-cn",
+    "zh-hans": "zh-cn",
+    "zh-tw": "zh-tw",
+    "en": "en",
+    "ja": "ja",
+    "ko": "ko",
+}
+
+translation_cache = TTLCache(
+    "translation",
+    maxsize=settings.translation_cache_max_entries,
+    ttl=settings.translation_cache_ttl,
+    persistent=True,
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.translation_max_workers,
+    thread_name_prefix="translate",
+)
+
+
+class TranslationUnavailable(Exception):
+    """翻译服务调用失败，结果不应写入缓存。"""
+
+    def __init__(self, detected_lang: str | None):
+        super().__init__(detected_lang)
+        self.detected_lang = detected_lang
+
+
+def normalize_lang_code(lang: str | None) -> str | None:
+    if not lang:
+        return None
+    lang_lower = lang.lower()
+    return LANGUAGE_ALIAS.get(lang_lower, lang_lower)
+
+
+def _detect_and_translate(keyword: str, normalized_target: str) -> tuple[str, str | None]:
+    try:
+        detected_lang = detect(keyword)
+    except LangDetectException:
+        detected_lang = None
+
+    if detected_lang and normalize_lang_code(detected_lang) == normalized_target:
+        return keyword, detected_lang
+
+    try:
+        translator = GoogleTranslator(source="auto", target=normalized_target)
+        translated_text = translator.translate(keyword)
+    except Exception as exc:
+        raise TranslationUnavailable(detected_lang) from exc
+
+    if translated_text and isinstance(translated_text, str):
+        return translated_text, detected_lang
+    raise TranslationUnavailable(detected_lang)
+
+
+def translate_keyword_if_needed(keyword: str, target_lang: str | None) -> tuple[str, str | None]:
+    """同步版本，不经过缓存。"""
+    normalized_target = normalize_lang_code(target_lang)
+    if not normalized_target:
+        return keyword, None
+
+    try:
+        return _detect_and_translate(keyword, normalized_target)
+    except TranslationUnavailable as exc:
+        # 如果翻译失败，保持原始关键词
+        return keyword, exc.detected_lang
+
+
+async def translate_keyword(keyword: str, target_lang: str | None) -> tuple[str, str | None]:
+    """带缓存的异步翻译；失败或超时时返回原始关键词。"""
+    normalized_target = normalize_lang_code(target_lang)
+    if not normalized_target:
+        return keyword, None
+
+    async def fetch() -> list[str | None]:
+        loop = asyncio.get_running_loop()
+        translated, detected = await asyncio.wait_for(
+            loop.run_in_executor(_executor, _detect_and_translate, keyword, normalized_target),
+            timeout=settings.translation_timeout,
+        )
+        return [translated, detected]
+
+    try:
+        translated, detected = await translation_cache.get_or_fetch(
+            make_key(keyword, normalized_target), fetch
+        )
+    except TranslationUnavailable as exc:
+        return keyword, exc.detected_lang
+    except asyncio.TimeoutError:
+        logger.warning("关键词翻译超时: %s", keyword)
+        return keyword, None
+    return translated, detected
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,128 @@
+"""``videos?part=contentDetails`` 微批量查询
+
+在几毫秒的窗口内收集并发搜索请求的视频 ID，先去重并查询单视频时长缓存，
+再以最少的 50-ID 批次调用 YouTube Data API。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Iterable
+
+import httpx
+
+from ..config import settings
+from . import youtube_client
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MAX_IDS_PER_REQUEST = 50
+
+
+class VideoDetailsBatcher:
+    def __init__(self, cache: TTLCache, *, window: float, batch_size: int = MAX_IDS_PER_REQUEST):
+        self.cache = cache
+        self.window = window
+        self.batch_size = min(batch_size, MAX_IDS_PER_REQUEST)
+        self._queue: list[str] = []
+        self._pending: dict[str, asyncio.Future] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.requested_ids = 0
+        self.shared_ids = 0
+        self.upstream_calls = 0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "requestedIds": self.requested_ids,
+            "sharedIds": self.shared_ids,
+            "upstreamCalls": self.upstream_calls,
+            "windowSeconds": self.window,
+            "durationCache": self.cache.stats(),
+        }
+
+    async def get_durations(self, video_ids: Iterable[str]) -> dict[str, str]:
+        """返回 ``video_id -> ISO8601 时长``，查询失败或视频不存在的 ID 不会出现在结果中。"""
+        durations: dict[str, str] = {}
+        waiting: dict[str, asyncio.Future] = {}
+
+        for video_id in dict.fromkeys(video_ids):
+            self.requested_ids += 1
+            cached = self.cache.get(video_id)
+            if cached is not None:
+                durations[video_id] = cached
+                continue
+
+            future = self._pending.get(video_id)
+            if future is None:
+                future = asyncio.get_running_loop().create_future()
+                self._pending[video_id] = future
+                self._enqueue(video_id)
+            else:
+                self.shared_ids += 1
+            waiting[video_id] = future
+
+        if waiting:
+            # shield：某个搜索请求被取消时不影响共享同一批次的其他请求
+            results = await asyncio.gather(*(asyncio.shield(f) for f in waiting.values()))
+            for video_id, duration in zip(waiting, results):
+                if duration is not None:
+                    durations[video_id] = duration
+        return durations
+
+    def _enqueue(self, video_id: str) -> None:
+        self._queue.append(video_id)
+        if len(self._queue) >= self.batch_size:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        video_ids, self._queue = self._queue, []
+        for start in range(0, len(video_ids), self.batch_size):
+            task = asyncio.ensure_future(self._fetch_batch(video_ids[start : start + self.batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch_batch(self, video_ids: list[str]) -> None:
+        durations: dict[str, str] = {}
+        try:
+            self.upstream_calls += 1
+            resp = await youtube_client.api_get(
+                "videos",
+                {"part": "contentDetails", "id": ",".join(video_ids)},
+            )
+            if resp.status_code == 200:
+                for item in resp.json().get("items", []):
+                    durations[item["id"]] = item["contentDetails"]["duration"]
+            else:
+                logger.warning("获取视频时长失败: HTTP %s", resp.status_code)
+        except httpx.HTTPError as exc:
+            logger.warning("获取视频时长失败: %s", exc)
+        except (ValueError, KeyError, TypeError) as exc:
+            # 响应体不是合法 JSON 或缺少字段，与请求失败一样按无时长处理
+            logger.warning("视频时长响应格式异常: %r", exc)
+        finally:
+            for video_id in video_ids:
+                duration = durations.get(video_id)
+                if duration is not None:
+                    self.cache.set(video_id, duration)
+                future = self._pending.pop(video_id, None)
+                if future is not None and not future.done():
+                    future.set_result(duration)
+
+
+duration_cache = TTLCache(
+    "video_duration",
+    maxsize=settings.duration_cache_max_entries,
+    ttl=settings.duration_cache_ttl,
+)
+
+batcher = VideoDetailsBatcher(
+    duration_cache,
+    window=settings.video_details_batch_window_ms / 1000,
+)
@@ -0,0 +1,78 @@
+"""YouTube Data API 共享 HTTP 客户端
+
+整个应用生命周期内复用同一个 ``httpx.AsyncClient``，避免每次搜索都重新建立 TCP/TLS 连接。
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = settings.youtube_http2 and _http2_available()
+    if settings.youtube_http2 and not http2:
+        logger.warning("未安装 h2，YouTube 客户端回退到 HTTP/1.1")
+
+    limits = httpx.Limits(
+        max_connections=settings.youtube_max_connections,
+        max_keepalive_connections=settings.youtube_max_keepalive_connections,
+        keepalive_expiry=settings.youtube_keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        base_url=settings.youtube_api_base,
+        http2=http2,
+        limits=limits,
+        timeout=_endpoint_timeout(None),
+    )
+
+
+def _endpoint_timeout(endpoint: str | None) -> httpx.Timeout:
+    per_endpoint = {
+        "search": settings.youtube_search_timeout,
+        "videos": settings.youtube_videos_timeout,
+    }
+    read_timeout = per_endpoint.get(endpoint or "", settings.youtube_default_timeout)
+    return httpx.Timeout(read_timeout, connect=settings.youtube_connect_timeout)
+
+
+async def startup() -> None:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+
+
+async def shutdown() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """返回共享客户端；未经过 startup（例如脚本中直接调用）时按需创建。"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def api_get(endpoint: str, params: dict[str, Any]) -> httpx.Response:
+    """调用 YouTube Data API，自动附带 API Key 与该端点的超时设置。"""
+    query = {**params, "key": settings.youtube_api_key}
+    return await get_client().get(endpoint, params=query, timeout=_endpoint_timeout(endpoint))
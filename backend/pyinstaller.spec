@@ -1,11 +1,21 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import subprocess
+import sys
 from pathlib import Path
 
 from PyInstaller.utils.hooks import collect_submodules
 
 project_root = Path.cwd()
 
+# 词表快照是构建产物，缺失时先从 COCA CSV 编译
+lexicon_snapshot = project_root / "data" / "lexicon.bin"
+if not lexicon_snapshot.exists():
+    subprocess.run(
+        [sys.executable, str(project_root / "scripts" / "build_lexicon_snapshot.py")],
+        check=True,
+    )
+
 hiddenimports = (
     collect_submodules("app")
     + collect_submodules("license_service")
@@ -14,6 +24,8 @@ hiddenimports = (
 
 datas = [
     (str(project_root / ".env"), "."),
+    (str(project_root / "data" / "inflections.txt.gz"), "data"),
+    (str(lexicon_snapshot), "data"),
 ]
 
 block_cipher = None
@@ -0,0 +1,85 @@
+"""
+比较难度分析的纯 Python 与 NumPy 后端（结果一致性 + 耗时）
+
+除端到端耗时外单独列出查表统计（tally）的耗时：分词对两个后端相同且占大部分时间，
+只有 tally 一列能看出向量化本身的收益。auto 后端在 NumPy 胜出前使用 python。
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.services.difficulty import BACKEND_NUMPY, BACKEND_PYTHON, DifficultyAnalyzer
+from app.services.lexicon import Lexicon
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "coca_5000.csv")
+
+
+def load_csv_lexicon() -> Lexicon:
+    ranks = {}
+    with open(DATA_FILE, "r", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            ranks.setdefault(row["lemma"].strip().lower(), int(row["rank"]))
+    return Lexicon(version="csv", ranks=MappingProxyType(ranks))
+
+
+def build_transcript(lexicon: Lexicon, tokens: int, rare_ratio: float, seed: int) -> str:
+    rng = random.Random(seed)
+    words = list(lexicon.ranks)
+    # 按 Zipf 分布抽词，接近真实字幕的词频形态
+    weights = [1 / rank for rank in lexicon.ranks.values()]
+    sample = rng.choices(words, weights=weights, k=tokens)
+    for i in range(0, tokens, max(int(1 / rare_ratio), 1) if rare_ratio else tokens + 1):
+        sample[i] = "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=9))
+    return " ".join(sample)
+
+
+def best_of(repeat: int, func, *args):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="难度分析后端基准测试")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", help="逗号分隔的词数")
+    parser.add_argument("--rare-ratio", type=float, default=0.05, help="生僻词比例")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    lexicon = load_csv_lexicon()
+    python_analyzer = DifficultyAnalyzer(lexicon=lexicon, backend=BACKEND_PYTHON)
+    numpy_analyzer = DifficultyAnalyzer(lexicon=lexicon, backend=BACKEND_NUMPY)
+
+    print(
+        f"{'tokens':>10} {'python(ms)':>12} {'numpy(ms)':>12} {'speedup':>8}"
+        f" {'tally py(ms)':>13} {'tally np(ms)':>13} {'speedup':>8}  match"
+    )
+    for size in (int(s) for s in args.sizes.split(",")):
+        transcript = build_transcript(lexicon, size, args.rare_ratio, args.seed)
+        py_time, py_stats = best_of(args.repeat, python_analyzer.analyse, transcript)
+        np_time, np_stats = best_of(args.repeat, numpy_analyzer.analyse, transcript)
+        counts = python_analyzer.count_tokens(transcript)
+        py_tally, _ = best_of(args.repeat, python_analyzer._tally, counts)
+        np_tally, _ = best_of(args.repeat, numpy_analyzer._tally_vectorized, counts)
+        print(
+            f"{size:>10} {py_time * 1000:>12.2f} {np_time * 1000:>12.2f} {py_time / np_time:>7.2f}x"
+            f" {py_tally * 1000:>13.2f} {np_tally * 1000:>13.2f} {py_tally / np_tally:>7.2f}x"
+            f"  {py_stats == np_stats}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+根据 COCA 词表离线生成词形映射文件 data/inflections.txt.gz
+
+规则变化按词性生成（名词复数、动词三单/过去式/进行时、形容词比较级），
+不规则变化与常见缩写来自下方的表格。本身就是 COCA 词元的形式一般不会被映射，
+但不规则动词的形式在原形排名更靠前时覆盖同形词元（found → find、left → leave），
+同一形式对应多个词元时取排名靠前（更常见）的词元。
+"""
+import argparse
+import csv
+import gzip
+import os
+import re
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.services.lemmatizer import DEFAULT_INDEX_PATH, FORMAT_HEADER
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "coca_5000.csv")
+
+IRREGULAR_VERBS = {
+    "arise": "arose arisen", "awake": "awoke awoken", "be": "am is are was were been being",
+    "bear": "bore borne born", "beat": "beaten", "become": "became", "begin": "began begun",
+    "bend": "bent", "bind": "bound", "bite": "bit bitten", "bleed": "bled",
+    "blow": "blew blown", "break": "broke broken", "breed": "bred", "bring": "brought",
+    "build": "built", "burn": "burnt", "buy": "bought", "catch": "caught", "choose": "chose chosen",
+    "cling": "clung", "come": "came", "creep": "crept", "deal": "dealt", "dig": "dug",
+    "do": "does did done doing", "draw": "drew drawn", "dream": "dreamt", "drink": "drank drunk",
+    "drive": "drove driven", "eat": "ate eaten", "fall": "fell fallen", "feed": "fed",
+    "feel": "felt", "fight": "fought", "find": "found", "flee": "fled", "fly": "flew flown",
+    "forbid": "forbade forbidden", "forget": "forgot forgotten", "forgive": "forgave forgiven",
+    "freeze": "froze frozen", "get": "got gotten", "give": "gave given", "go": "went gone goes going",
+    "grind": "ground", "grow": "grew grown", "hang": "hung", "have": "has had having",
+    "hear": "heard", "hide": "hid hidden", "hold": "held", "keep": "kept",
+    "kneel": "knelt", "know": "knew known", "lay": "laid", "lead": "led", "lean": "leant",
+    "leap": "leapt", "learn": "learnt", "leave": "left", "lend": "lent", "lie": "lay lain lying",
+    "light": "lit", "lose": "lost", "make": "made", "mean": "meant", "meet": "met",
+    "mistake": "mistook mistaken", "overcome": "overcame", "pay": "paid", "prove": "proven",
+    "ride": "rode ridden", "ring": "rang rung", "rise": "rose risen", "run": "ran",
+    "say": "said", "see": "saw seen", "seek": "sought", "sell": "sold", "send": "sent",
+    "shake": "shook shaken", "shine": "shone", "shoot": "shot", "show": "shown",
+    "shrink": "shrank shrunk", "sing": "sang sung", "sink": "sank sunk", "sit": "sat",
+    "sleep": "slept", "slide": "slid", "speak": "spoke spoken", "speed": "sped",
+    "spend": "spent", "spin": "spun", "spit": "spat", "spring": "sprang sprung",
+    "stand": "stood", "steal": "stole stolen", "stick": "stuck",
+    "sting": "stung", "strike": "struck stricken", "strive": "strove striven", "swear": "swore sworn",
+    "sweep": "swept", "swim": "swam swum", "swing": "swung", "take": "took taken",
+    "teach": "taught", "tear": "tore torn", "tell": "told", "think": "thought",
+    "throw": "threw thrown", "understand": "understood", "undertake": "undertook undertaken",
+    "wake": "woke woken", "wear": "wore worn", "weep": "wept", "win": "won",
+    "wind": "wound", "withdraw": "withdrew withdrawn", "write": "wrote written",
+}
+
+IRREGULAR_NOUNS = {
+    "child": "children", "man": "men", "woman": "women", "person": "people", "foot": "feet",
+    "tooth": "teeth", "mouse": "mice", "goose": "geese", "ox": "oxen", "life": "lives",
+    "wife": "wives", "knife": "knives", "leaf": "leaves", "half": "halves", "shelf": "shelves",
+    "wolf": "wolves", "thief": "thieves", "self": "selves", "loaf": "loaves", "calf": "calves",
+    "crisis": "crises", "analysis": "analyses", "thesis": "theses", "hypothesis": "hypotheses",
+    "basis": "bases", "criterion": "criteria", "phenomenon": "phenomena", "medium": "media",
+    "datum": "data", "curriculum": "curricula", "index": "indices", "appendix": "appendices",
+    "nucleus": "nuclei", "stimulus": "stimuli", "fungus": "fungi", "cactus": "cacti",
+}
+
+IRREGULAR_ADJECTIVES = {
+    "good": "better best", "bad": "worse worst", "far": "farther further farthest furthest",
+    "little": "less least", "many": "more most", "much": "more most",
+}
+
+PRONOUNS = {
+    "i": "me my mine myself", "you": "your yours yourself yourselves",
+    "he": "him his himself", "she": "her hers herself", "it": "its itself",
+    "we": "us our ours ourselves", "they": "them their theirs themselves",
+}
+
+# 需要整体展开的缩写；有规律的后缀（'ll、're 等）在运行时拆分
+CONTRACTIONS = {
+    "do not": "don't", "does not": "doesn't", "did not": "didn't", "can not": "can't cannot",
+    "could not": "couldn't", "will not": "won't", "would not": "wouldn't",
+    "shall not": "shan't", "should not": "shouldn't", "must not": "mustn't",
+    "need not": "needn't", "might not": "mightn't", "be not": "isn't aren't wasn't weren't ain't",
+    "have not": "haven't hasn't hadn't", "i be": "i'm", "let us": "let's",
+    "because": "'cause cos", "going to": "gonna", "want to": "wanna", "got to": "gotta",
+    "kind of": "kinda", "sort of": "sorta", "out of": "outta",
+}
+
+# 排名规则会误判的同形词：名词义远比动词变化常见，保留为独立词元
+HOMOGRAPH_LEMMAS = {"lay", "rose", "wound"}
+
+VOWELS = "aeiou"
+_CVC = re.compile(r"^[^aeiou]*[aeiou][^aeiouwxy]$")
+
+
+def _sibilant(word: str) -> bool:
+    return word.endswith(("s", "x", "z", "ch", "sh"))
+
+
+def _consonant_y(word: str) -> bool:
+    return len(word) > 1 and word.endswith("y") and word[-2] not in VOWELS
+
+
+def plural(word: str) -> str:
+    if _sibilant(word):
+        return word + "es"
+    if _consonant_y(word):
+        return word[:-1] + "ies"
+    return word + "s"
+
+
+def _doubles(word: str) -> bool:
+    # 单音节“辅音-元音-辅音”结尾时双写末尾辅音：stop → stopped
+    return bool(_CVC.match(word))
+
+
+def _with_suffix(word: str, suffix: str) -> str:
+    """附加以元音开头的后缀（-ed/-ing/-er/-est）。"""
+    if suffix != "ing" and _consonant_y(word):
+        return word[:-1] + "i" + suffix
+    if word.endswith("e") and not word.endswith(("ee", "ye", "oe")):
+        if suffix == "ing":
+            return (word[:-2] + "ying") if word.endswith("ie") else word[:-1] + "ing"
+        return word + suffix[1:]
+    if _doubles(word):
+        return word + word[-1] + suffix
+    return word + suffix
+
+
+def regular_forms(lemma: str, pos: str) -> list[str]:
+    if not lemma.isalpha():
+        return []
+    if pos == "n" and lemma not in IRREGULAR_NOUNS:
+        return [plural(lemma)]
+    if pos == "v":
+        irregular = IRREGULAR_VERBS.get(lemma)
+        if irregular is None:
+            return [plural(lemma), _with_suffix(lemma, "ed"), _with_suffix(lemma, "ing")]
+        # 不规则动词表只列出过去式/过去分词；列出了 -ing 形式的表示已完整给出
+        if not irregular.endswith("ing"):
+            return [plural(lemma), _with_suffix(lemma, "ing")]
+    if pos == "j" and lemma not in IRREGULAR_ADJECTIVES:
+        return [_with_suffix(lemma, "er"), _with_suffix(lemma, "est")]
+    return []
+
+
+def load_lemmas(path: str) -> list[tuple[str, str]]:
+    """返回按排名排序的 (词元, 词性)；同一词元不同词性各占一行。"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        rows = [
+            (int(row["rank"]), row["lemma"].strip().lower(), (row.get("PoS") or "").strip())
+            for row in csv.DictReader(f)
+        ]
+    rows.sort()
+    return [(lemma, pos) for _, lemma, pos in rows]
+
+
+def build_index(lemmas: list[tuple[str, str]]) -> dict[str, list[str]]:
+    """返回 ``词元 -> 形式列表``。"""
+    rank: dict[str, int] = {}
+    for position, (lemma, _) in enumerate(lemmas):
+        rank.setdefault(lemma, position)
+    owner: dict[str, str] = {}
+
+    def claim(form: str, lemma: str) -> None:
+        if form != lemma and form not in rank and form not in owner:
+            owner[form] = lemma
+
+    # 不规则变化优先于规则生成的形式
+    for lemma, forms in IRREGULAR_VERBS.items():
+        if lemma in rank:
+            for form in forms.split():
+                if form in rank and form not in HOMOGRAPH_LEMMAS and rank[lemma] < rank[form]:
+                    owner.setdefault(form, lemma)
+                else:
+                    claim(form, lemma)
+    for table in (IRREGULAR_NOUNS, IRREGULAR_ADJECTIVES, PRONOUNS):
+        for lemma, forms in table.items():
+            if lemma in rank:
+                for form in forms.split():
+                    claim(form, lemma)
+    # lemmas 已按排名排序，先出现的常见词元优先占用同一形式
+    for lemma, pos in lemmas:
+        for form in regular_forms(lemma, pos):
+            claim(form, lemma)
+    for expansion, forms in CONTRACTIONS.items():
+        for form in forms.split():
+            owner.setdefault(form, expansion)
+
+    index: dict[str, list[str]] = {}
+    for form, lemma in owner.items():
+        index.setdefault(lemma, []).append(form)
+    return index
+
+
+def write_index(index: dict[str, list[str]], output: Path) -> None:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + ".tmp")
+    # mtime=0 保证相同输入生成的文件字节一致
+    with open(tmp, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+        lines = [FORMAT_HEADER]
+        lines.extend(f"{lemma}\t{' '.join(sorted(forms))}" for lemma, forms in sorted(index.items()))
+        gz.write(("\n".join(lines) + "\n").encode("utf-8"))
+    os.replace(tmp, output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input", default=DATA_FILE, help="COCA CSV 路径")
+    parser.add_argument("--output", default=str(DEFAULT_INDEX_PATH), help="输出文件路径")
+    args = parser.parse_args()
+
+    index = build_index(load_lemmas(args.input))
+    output = Path(args.output)
+    write_index(index, output)
+    forms = sum(len(forms) for forms in index.values())
+    print(f"生成 {forms} 个形式 → {len(index)} 个词元，写入 {output}（{output.stat().st_size} 字节）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+把 COCA 词频数据编译为二进制词表快照 data/lexicon.bin
+
+默认直接读取 CSV（与 import_coca.py 相同的合并规则），版本号取自文件内容的哈希；
+--from-db 时导出数据库中当前导入的词表并沿用其版本号，后端启动时发现版本一致即直接映射快照。
+PyInstaller 打包前需要先运行本脚本（pyinstaller.spec 会在快照缺失时自动调用）。
+"""
+import argparse
+import hashlib
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = Path(__file__).resolve().parent
+# 以模块方式运行（python -m）或从其他目录调用时，同目录的 import_coca 也要能导入
+for path in (BASE_DIR, SCRIPTS_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from app.database import SessionLocal
+from app.services.lexicon import DEFAULT_SNAPSHOT_PATH, GENRES, build_lexicon, read_lexicon_records
+from app.services.lexicon_snapshot import write_snapshot
+from import_coca import DATA_FILE, iter_rows
+
+
+def records_from_csv(paths: list[str]) -> tuple[str, list]:
+    digest = hashlib.sha1()
+    best: dict[str, tuple[str, int, tuple]] = {}
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+        for row in iter_rows(path):
+            current = best.get(row["lemma"])
+            # 同一词元保留排名靠前的一行
+            if current is None or row["rank"] < current[1]:
+                genres = tuple(row[f"{genre}_pm"] for genre in GENRES)
+                best[row["lemma"]] = (row["lemma"], row["rank"], genres)
+    return f"csv-{digest.hexdigest()[:16]}", list(best.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="生成二进制词表快照")
+    parser.add_argument("inputs", nargs="*", help=f"CSV 文件，默认 {DATA_FILE}")
+    parser.add_argument("--from-db", action="store_true", help="导出数据库中当前的词表")
+    parser.add_argument("--output", default=str(DEFAULT_SNAPSHOT_PATH), help="输出文件路径")
+    args = parser.parse_args()
+
+    if args.from_db:
+        with SessionLocal() as db:
+            version, records = read_lexicon_records(db)
+    else:
+        version, records = records_from_csv(args.inputs or [DATA_FILE])
+
+    lexicon = build_lexicon(version, records)
+    output = write_snapshot(lexicon, args.output)
+    print(f"写入 {len(lexicon)} 个词条（版本 {version}）→ {output}（{output.stat().st_size} 字节）")
+
+
+if __name__ == "__main__":
+    main()
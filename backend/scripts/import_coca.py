@@ -1,49 +1,145 @@
 """
 将 COCA 词频数据导入数据库
+
+逐行流式解析 CSV，按块 executemany 写入临时表（同一词元保留排名最靠前的一行），
+全部写完后在一个事务内用临时表替换 word_frequencies 并写入新的词表版本，
+运行中的后端任何时刻读到的都是完整的旧表或新表。可一次导入多个词频表。
 """
+import argparse
 import csv
 import os
 import sys
+import time
+import uuid
+from itertools import islice
 from pathlib import Path
+from typing import Iterable, Iterator
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 
-from app.database import SessionLocal
-from app.models import WordFrequency
+from sqlalchemy import MetaData, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database import Base, engine
+from app.models import LexiconVersion, WordFrequency
 
 DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "coca_5000.csv")
+STAGING_TABLE = "word_frequencies_import"
+
+# CSV 列名 → word_frequencies 列名
+GENRE_COLUMNS = {
+    "blogPM": "blog_pm",
+    "webPM": "web_pm",
+    "TVMPM": "tvm_pm",
+    "spokPM": "spok_pm",
+    "ficPM": "fic_pm",
+    "magPM": "mag_pm",
+    "newsPM": "news_pm",
+    "acadPM": "acad_pm",
+}
+
+
+def _to_float(value: str | None) -> float | None:
+    if value is None:
+        return None
+    value = value.strip().replace(",", "")
+    return float(value) if value else None
+
+
+def iter_rows(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            lemma = (row.get("lemma") or "").strip().lower()
+            if not lemma:
+                continue
+            record = {
+                "lemma": lemma,
+                "pos": row.get("PoS"),
+                "rank": int(row["rank"]),
+                "frequency": int(_to_float(row["freq"]) or 0),
+                "per_million": _to_float(row.get("perMil")),
+            }
+            for source, column in GENRE_COLUMNS.items():
+                record[column] = _to_float(row.get(source))
+            yield record
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _load_staging(paths: list[str], chunk_size: int):
+    staging = WordFrequency.__table__.to_metadata(MetaData(), name=STAGING_TABLE)
+    staging.drop(engine, checkfirst=True)
+    staging.create(engine)
+
+    stmt = sqlite_insert(staging)
+    columns = [column.name for column in staging.columns if column.name not in ("id", "lemma")]
+    # 同一词元出现多次（不同词性或多个词频表）时保留排名靠前的一行
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["lemma"],
+        set_={name: stmt.excluded[name] for name in columns},
+        where=stmt.excluded.rank < staging.c.rank,
+    )
+
+    rows_read = 0
+    with engine.begin() as conn:
+        for path in paths:
+            for chunk in _chunks(iter_rows(path), chunk_size):
+                conn.execute(stmt, chunk)
+                rows_read += len(chunk)
+        entries = conn.scalar(select(func.count()).select_from(staging))
+    return staging, rows_read, entries
+
+
+def _swap_in(staging, entries: int) -> str:
+    target = WordFrequency.__table__
+    version = uuid.uuid4().hex
+    # pysqlite 默认不会为 DDL 开启事务，这里手动 BEGIN，保证删表、改名与写版本一起提交
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            target.drop(conn, checkfirst=True)
+            conn.exec_driver_sql(f'ALTER TABLE "{STAGING_TABLE}" RENAME TO "{target.name}"')
+            # 索引随表改名但保留临时表的名字，换成正式名称以便下次导入
+            for index in staging.indexes:
+                index.drop(conn)
+            for index in target.indexes:
+                index.create(conn)
+            # 写入新版本号，运行中的后端据此热加载词表
+            conn.execute(insert(LexiconVersion.__table__).values(version=version, entries=entries))
+            conn.exec_driver_sql("COMMIT")
+        except Exception:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+    return version
+
+
+def import_coca(paths: list[str] | None = None, chunk_size: int = 5000):
+    paths = paths or [DATA_FILE]
+    started = time.perf_counter()
+    Base.metadata.create_all(bind=engine, tables=[LexiconVersion.__table__])
+
+    staging, rows_read, entries = _load_staging(paths, chunk_size)
+    version = _swap_in(staging, entries)
+    elapsed = time.perf_counter() - started
+    print(
+        f"导入 {entries} 条词频记录（读取 {rows_read} 行，合并重复 {rows_read - entries} 条），"
+        f"版本 {version}，耗时 {elapsed:.2f} 秒"
+    )
 
 
-def import_coca():
-    session = SessionLocal()
-    try:
-        with open(DATA_FILE, "r", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            unique_words = {}
-            duplicate_count = 0
-            for row in reader:
-                lemma = row["lemma"].strip().lower()
-                if lemma in unique_words:
-                    duplicate_count += 1
-                    continue
-
-                unique_words[lemma] = WordFrequency(
-                    lemma=lemma,
-                    pos=row.get("PoS"),
-                    rank=int(row["rank"]),
-                    frequency=int(row["freq"]),
-                    per_million=float(row["perMil"]),
-                )
-
-            session.query(WordFrequency).delete()
-            session.bulk_save_objects(list(unique_words.values()))
-            session.commit()
-            print(f"导入 {len(unique_words)} 条词频记录（忽略重复 {duplicate_count} 条）")
-    finally:
-        session.close()
+def main() -> None:
+    parser = argparse.ArgumentParser(description="将 COCA 词频数据导入数据库")
+    parser.add_argument("inputs", nargs="*", help=f"CSV 文件，默认 {DATA_FILE}")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="每批写入的行数")
+    args = parser.parse_args()
+    import_coca(args.inputs, args.chunk_size)
 
 
 if __name__ == "__main__":
-    import_coca()
\ No newline at end of file
+    main()
@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+import pytest
+
+# database.py 使用相对路径 ./data.db，导入 app 之前切换到临时目录，避免写入开发数据库
+_workdir = tempfile.mkdtemp(prefix="ydl-tests-")
+os.chdir(_workdir)
+
+from app.database import Base, engine  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,40 @@
+import asyncio
+
+from app.services.cache import TTLCache
+from app.services.prefetch import Prefetcher
+
+
+def test_persistent_read_failure_falls_through_to_fetcher(monkeypatch):
+    cache = TTLCache("test", maxsize=4, ttl=60, persistent=True)
+
+    def broken(key):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(cache, "_db_get", broken)
+
+    async def fetch():
+        return {"ok": True}
+
+    assert asyncio.run(cache.get_or_fetch("k", fetch)) == {"ok": True}
+    assert cache.misses == 1 and cache.get("k") == {"ok": True}
+
+
+def test_prefetch_expiry_does_not_drop_a_newer_entry():
+    async def scenario():
+        cache = TTLCache("search", maxsize=4, ttl=60)
+        prefetcher = Prefetcher(cache, ttl=0.05, concurrency=2)
+
+        async def fetch():
+            return "page"
+
+        await prefetcher.schedule("k", fetch)
+        await asyncio.sleep(0.03)
+        cache.discard("k")
+        await prefetcher.schedule("k", fetch)
+        # 第一次预取的定时器到期时，第二次预取的记录应当保留
+        await asyncio.sleep(0.03)
+        assert prefetcher.mark_used("k", "page")
+        assert not prefetcher._prefetched
+        prefetcher.shutdown()
+
+    asyncio.run(scenario())
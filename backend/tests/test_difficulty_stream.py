@@ -0,0 +1,71 @@
+import json
+import random
+from types import MappingProxyType
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import lexicon as lexicon_module
+from app.services.difficulty import DifficultyAnalyzer
+from app.services.lemmatizer import Lemmatizer
+from app.services.lexicon import build_lexicon
+
+WORDS = ["the", "go", "run", "house", "quick", "brown", "fox", "jump", "lazy", "dog", "child"]
+TEXT = (
+    "The quick brown fox went running, jumped over the lazy dogs. "
+    "Children don't go to the house; café naïve zyzzyva qwxz. " * 40
+)
+
+
+@pytest.fixture
+def lexicon():
+    return build_lexicon("test", [(word, (i + 1) * 700, None) for i, word in enumerate(WORDS)])
+
+
+@pytest.fixture
+def analyzer(lexicon):
+    lemmatizer = Lemmatizer(
+        MappingProxyType({"went": ("go",), "running": ("run",), "jumped": ("jump",), "dogs": ("dog",),
+                          "children": ("child",), "don't": ("do", "not")})
+    )
+    return DifficultyAnalyzer(lexicon=lexicon, lemmatizer=lemmatizer, backend="python", profile="overall")
+
+
+def _split(text: str, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    chunks, start = [], 0
+    while start < len(text):
+        end = start + rng.randint(1, 17)
+        chunks.append(text[start:end])
+        start = end
+    return chunks
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_chunked_stream_matches_whole_text(analyzer, seed):
+    whole = analyzer.analyse(TEXT)
+    streamed = analyzer.analyse_stream(_split(TEXT, seed))
+
+    for name in ("total_tokens", "unique_tokens", "covered_tokens", "covered_types",
+                 "band_counts", "band_type_counts", "difficulty_level"):
+        assert getattr(streamed, name) == getattr(whole, name), name
+    assert streamed.coverage_ratio == pytest.approx(whole.coverage_ratio)
+    assert sorted(streamed.rare_tokens) == sorted(whole.rare_tokens)
+
+
+def test_stream_endpoint_emits_ndjson(lexicon, monkeypatch):
+    monkeypatch.setattr(lexicon_module, "_current", lexicon)
+    client = TestClient(app)
+
+    response = client.post("/api/difficulty/stream", params={"interval": 200}, content=TEXT.encode("utf-8"))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[-1]["type"] == "result"
+    assert lines[-1]["lexicon_version"] == "test"
+    assert all(line["type"] == "interim" for line in lines[:-1])
+    assert lines[-1]["stats"]["total_tokens"] >= max(
+        (line["stats"]["total_tokens"] for line in lines[:-1]), default=0
+    )
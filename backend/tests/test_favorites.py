@@ -0,0 +1,128 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, inspect
+
+from app.database import engine, ensure_indexes
+from app.main import app
+from app.models import Collection, FavoriteVideo
+
+# 不进入上下文管理器，避免触发启动事件（下载队列、词表加载等）
+client = TestClient(app)
+
+
+def _collection(name: str = "c") -> int:
+    response = client.post("/api/favorites/collections", json={"name": name})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _items(count: int, start: int = 0) -> list[dict]:
+    return [{"video_id": f"v{i:05d}", "title": f"video {i}"} for i in range(start, start + count)]
+
+
+def test_keyset_pagination_walks_every_favorite_once():
+    collection_id = _collection()
+    client.post(f"/api/favorites/collections/{collection_id}/favorites/bulk", json={"items": _items(23)})
+
+    seen: list[str] = []
+    cursor = None
+    while True:
+        params = {"limit": 5, **({"cursor": cursor} if cursor else {})}
+        page = client.get(f"/api/favorites/collections/{collection_id}/favorites", params=params).json()
+        seen.extend(item["video_id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 23
+
+    bad = client.get(f"/api/favorites/collections/{collection_id}/favorites", params={"cursor": "@@"})
+    assert bad.status_code == 400
+
+
+def test_bulk_add_skips_duplicates_and_move_merges():
+    source, target = _collection("a"), _collection("b")
+    url = f"/api/favorites/collections/{source}/favorites"
+
+    first = client.post(f"{url}/bulk", json={"items": _items(10) + _items(2)}).json()
+    assert (first["added"], first["skipped"]) == (10, 2)
+    again = client.post(f"{url}/bulk", json={"items": _items(10)}).json()
+    assert (again["added"], again["skipped"]) == (0, 10)
+
+    client.post(f"/api/favorites/collections/{target}/favorites/bulk", json={"items": _items(2)})
+    moved = client.post(
+        f"{url}/move", json={"video_ids": ["v00000", "v00001", "v00002", "v00003"], "target_collection_id": target}
+    ).json()
+    assert (moved["moved"], moved["merged"]) == (2, 2)
+
+    summary = {item["id"]: item["favorite_count"] for item in client.get("/api/favorites/collections/summary").json()["items"]}
+    assert summary == {source: 6, target: 4}
+
+
+@pytest.mark.parametrize("fmt", ["json", "csv"])
+def test_export_import_round_trip(fmt):
+    source = _collection("src")
+    client.post(f"/api/favorites/collections/{source}/favorites/bulk", json={"items": _items(30)})
+
+    exported = client.get(f"/api/favorites/collections/{source}/export", params={"format": fmt})
+    assert exported.status_code == 200
+    result = client.post(
+        "/api/favorites/collections/import", params={"format": fmt}, content=exported.content
+    ).json()
+    assert result["added"] == 30 and result["invalid"] == 0
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"collection": "x", "favorites": []},
+        {"collection": {}, "favorites": {"video_id": "a"}},
+        "just a string",
+    ],
+)
+def test_import_rejects_malformed_documents(body):
+    response = client.post("/api/favorites/collections/import", content=json.dumps(body))
+    assert response.status_code == 400
+
+
+def test_import_rejects_oversized_body(monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "favorites_import_max_bytes", 10)
+    response = client.post("/api/favorites/collections/import", content=b"[" + b" " * 100 + b"]")
+    assert response.status_code == 413
+
+
+def test_ensure_indexes_repairs_existing_duplicates():
+    # 模拟旧版本数据库：没有唯一索引、留有上一版的普通索引，且已存在重复收藏
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX uq_favorite_videos_collection_video")
+        conn.exec_driver_sql(
+            "CREATE INDEX ix_favorite_videos_collection_video ON favorite_videos (collection_id, video_id)"
+        )
+        conn.execute(insert(Collection.__table__).values(id=1, name="old"))
+        conn.execute(
+            insert(FavoriteVideo.__table__),
+            [
+                {"id": 1, "collection_id": 1, "video_id": "dup", "title": "first"},
+                {"id": 2, "collection_id": 1, "video_id": "dup", "title": "second"},
+                {"id": 3, "collection_id": 1, "video_id": "other", "title": "other"},
+            ],
+        )
+
+    ensure_indexes()
+
+    names = {index["name"] for index in inspect(engine).get_indexes("favorite_videos")}
+    assert "uq_favorite_videos_collection_video" in names
+    assert "ix_favorite_videos_collection_video" not in names
+
+    page = client.get("/api/favorites/collections/1/favorites").json()
+    assert sorted((item["id"], item["video_id"]) for item in page["items"]) == [(1, "dup"), (3, "other")]
+
+    bulk = client.post("/api/favorites/collections/1/favorites/bulk", json={"items": [{"video_id": "dup", "title": "t"}]})
+    assert bulk.status_code == 200 and bulk.json()["skipped"] == 1
+    imported = client.post(
+        "/api/favorites/collections/import", content=json.dumps([{"video_id": "dup", "title": "t"}])
+    )
+    assert imported.status_code == 201
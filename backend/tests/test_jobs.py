@@ -0,0 +1,98 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
+
+from app.database import SessionLocal
+from app.models import DownloadJob, DownloadStatus
+from app.services.download import DownloadCancelled
+from app.services.jobs import DownloadJobManager
+from app.services.progress import ProgressBroker
+from app.services.store import DownloadStore
+
+
+class BlockingStore:
+    """fetch 阻塞到 release 被设置，然后无视取消标志返回成功，模拟恰好完成的下载。"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def lookup(self, key):
+        return None
+
+    def fetch(self, key, **kwargs):
+        self.started.set()
+        self.release.wait(5)
+        return {"video_id": key[0], "filepath": "/tmp/x"}
+
+
+def _make_job(status=DownloadStatus.QUEUED) -> str:
+    job_id = uuid.uuid4().hex
+    with SessionLocal() as db:
+        db.add(DownloadJob(id=job_id, video_id="abc", status=status, created_at=datetime.utcnow()))
+        db.commit()
+    return job_id
+
+
+def _status(job_id: str) -> DownloadStatus:
+    with SessionLocal() as db:
+        return db.get(DownloadJob, job_id).status
+
+
+def test_cancel_running_job_is_not_overwritten_by_completion():
+    store = BlockingStore()
+    manager = DownloadJobManager(1, ProgressBroker(min_interval=0), store)
+    job_id = _make_job()
+
+    runner = threading.Thread(target=manager._run, args=(job_id,))
+    runner.start()
+    assert store.started.wait(5)
+    assert manager.cancel(job_id).status == DownloadStatus.RUNNING
+
+    store.release.set()
+    runner.join(5)
+    assert _status(job_id) == DownloadStatus.CANCELLED
+
+
+def test_finish_does_not_overwrite_cancelled():
+    store = BlockingStore()
+    manager = DownloadJobManager(1, ProgressBroker(min_interval=0), store)
+    job_id = _make_job()
+
+    manager.cancel(job_id)
+    assert _status(job_id) == DownloadStatus.CANCELLED
+    # 取消后才开始的运行不会再改写状态
+    manager._run(job_id)
+    assert not store.started.is_set()
+    assert _status(job_id) == DownloadStatus.CANCELLED
+
+
+def test_follower_cancel_returns_promptly(tmp_path):
+    store = DownloadStore(tmp_path, quota_bytes=0, metadata=None)
+    key = ("abc", "best", False)
+    store.lookup = lambda key: None
+    leader_future: Future = Future()
+    store._inflight[key] = leader_future
+
+    cancel_event = threading.Event()
+    errors: list[BaseException] = []
+
+    def follow():
+        try:
+            store.fetch(key, cancel_event=cancel_event)
+        except BaseException as exc:
+            errors.append(exc)
+
+    follower = threading.Thread(target=follow)
+    follower.start()
+    time.sleep(0.1)
+    cancel_event.set()
+    follower.join(2)
+
+    assert not follower.is_alive()
+    assert len(errors) == 1 and isinstance(errors[0], DownloadCancelled)
+    # 共享的下载不受影响
+    assert not leader_future.done()
+    leader_future.set_result({})
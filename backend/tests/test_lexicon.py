@@ -0,0 +1,31 @@
+from typing import get_args
+
+from app.config import DifficultyProfile
+from app.services.lexicon import PROFILES
+
+
+def test_profile_setting_matches_lexicon_profiles():
+    assert set(get_args(DifficultyProfile)) == set(PROFILES)
+
+
+def test_analyzer_with_session_does_not_replace_shared_lexicon(monkeypatch):
+    from app.database import SessionLocal
+    from app.services import lexicon
+    from app.services.difficulty import DifficultyAnalyzer
+
+    shared = lexicon.build_lexicon("shared", [("the", 1, None)])
+    monkeypatch.setattr(lexicon, "_current", shared)
+    with SessionLocal() as db:
+        analyzer = DifficultyAnalyzer(db)
+    assert analyzer.lexicon is not shared
+    assert lexicon.get_lexicon() is shared
+
+
+def test_irregular_forms_override_rarer_homograph_lemmas():
+    from app.services.lemmatizer import load_lemmatizer
+
+    lemmatizer = load_lemmatizer()
+    for form, lemma in {"found": "find", "left": "leave", "saw": "see", "felt": "feel", "thought": "think"}.items():
+        assert lemmatizer.lemmatize(form) == (lemma,)
+    # 名词义更常见的同形词仍按独立词元统计
+    assert lemmatizer.lemmatize("wound") == ("wound",)
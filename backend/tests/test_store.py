@@ -0,0 +1,86 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pytest
+
+from app.services import store as store_module
+from app.services.cache import TTLCache
+from app.services.download import DownloadError
+from app.services.metadata import MetadataService
+from app.services.store import DownloadStore
+
+
+class FakeMetadata:
+    def __init__(self):
+        self.invalidated = []
+
+    def get_info(self, video_id):
+        return {"id": video_id}
+
+    def invalidate(self, video_id):
+        self.invalidated.append(video_id)
+
+
+@pytest.mark.parametrize(
+    "message, retried",
+    [
+        ("ERROR: unable to download video data: HTTP Error 403: Forbidden", True),
+        ("ERROR: [youtube] v: Requested format is not available", True),
+        ("ERROR: unable to download video data: HTTP Error 404: Not Found", False),
+        ("ERROR: [youtube] v: Private video", False),
+    ],
+)
+def test_download_retries_only_stale_info_errors(tmp_path, monkeypatch, message, retried):
+    metadata = FakeMetadata()
+    store = DownloadStore(tmp_path, quota_bytes=1 << 30, metadata=metadata)
+    calls = []
+
+    def fake_download(**kwargs):
+        calls.append(kwargs.get("info"))
+        if len(calls) == 1:
+            raise DownloadError(message)
+        path = tmp_path / "v.mp4"
+        path.write_bytes(b"x")
+        return {"filepath": str(path), "filesize": 1, "title": "v", "ext": "mp4", "duration": 1}
+
+    monkeypatch.setattr(store_module, "download_video", fake_download)
+    key = ("v", "best", False)
+    if retried:
+        assert store.fetch(key)["file_id"]
+        assert calls == [{"id": "v"}, None] and metadata.invalidated == ["v"]
+    else:
+        with pytest.raises(DownloadError):
+            store.fetch(key)
+        assert len(calls) == 1 and metadata.invalidated == []
+
+
+def test_get_info_coalesces_concurrent_misses():
+    extracted = []
+    started, release = threading.Event(), threading.Event()
+
+    class FakeYDL:
+        def extract_info(self, url, download, process):
+            extracted.append(url)
+            started.set()
+            release.wait(5)
+            return {"id": url, "automatic_captions": {}}
+
+        def sanitize_info(self, info):
+            return dict(info)
+
+    class FakePool:
+        @contextmanager
+        def acquire(self):
+            yield FakeYDL()
+
+    service = MetadataService(FakePool(), TTLCache("info", maxsize=4, ttl=60))
+    with ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(service.get_info, "v") for _ in range(4)]
+        started.wait(5)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(extracted) == 1
+    assert all(result == {"id": extracted[0]} for result in results)
+    assert len({id(result) for result in results}) == 4
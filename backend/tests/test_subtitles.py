@@ -0,0 +1,130 @@
+import threading
+
+import pytest
+import yt_dlp
+
+from app.services.analysis import DifficultyPool
+from app.services.download import DownloadError
+from app.services.progress import ProgressBroker
+from app.services.subtitles import (
+    STATUS_FAILED,
+    STATUS_MISSING,
+    STATUS_PENDING,
+    SubtitleDifficultyPipeline,
+    iter_cue_lines,
+)
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = SubtitleDifficultyPipeline(
+        "en", max_workers=1, broker=ProgressBroker(min_interval=0, id_field=None), max_queued=2, failure_ttl=60,
+        pool=DifficultyPool(max_workers=1, min_parallel_items=2),
+    )
+    yield pipeline
+    pipeline.shutdown()
+
+
+def test_schedule_is_bounded(pipeline, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(pipeline, "analyse_video", lambda video_id: release.wait(5) and {})
+
+    assert pipeline.schedule(["a", "b", "c", "a"]) == ["a", "b"]
+    assert pipeline.status("a", None) == STATUS_PENDING
+    assert pipeline.status("c", None) == STATUS_MISSING
+    release.set()
+
+
+def test_temporary_failures_are_not_refetched(pipeline, monkeypatch):
+    calls = []
+
+    def fail(video_id, workdir):
+        calls.append(video_id)
+        raise DownloadError("network down")
+
+    monkeypatch.setattr(pipeline, "fetch_subtitle_file", fail)
+    result = pipeline.analyse_video("x")
+    assert result["stats"] is None and result["error"] == "network down"
+
+    cached = pipeline.lookup(["x"])
+    assert pipeline.status("x", cached["x"]) == STATUS_FAILED
+    assert pipeline.schedule(["x"]) == []
+    pipeline.analyse_video("x")
+    assert calls == ["x"]
+
+
+SRT = """1
+00:00:01,000 --> 00:00:02,000
+The year was
+
+2
+00:00:02,000 --> 00:00:03,000
+1984
+
+3
+00:00:03,000 --> 00:00:04,000
+Run!
+
+4
+00:00:04,000 --> 00:00:05,000
+Run!
+"""
+
+
+def test_cue_lines_keep_numeric_text_and_manual_repeats():
+    assert list(iter_cue_lines(SRT.splitlines())) == ["The year was", "1984", "Run!", "Run!"]
+
+
+def test_cue_lines_dedupe_auto_caption_rollover():
+    vtt = ["WEBVTT", "", "00:00.000 --> 00:01.000", "hello there", "",
+           "00:01.000 --> 00:02.000", "hello there", "general kenobi", "", "42"]
+    assert list(iter_cue_lines(vtt, auto_generated=True)) == ["hello there", "general kenobi", "42"]
+
+
+def test_permanent_failures_are_cached(pipeline, monkeypatch):
+    calls = []
+
+    class PrivateVideo:
+        def __init__(self, opts):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download):
+            calls.append(url)
+            raise yt_dlp.utils.DownloadError("ERROR: [youtube] p: Private video. Sign in if you've been granted access")
+
+    monkeypatch.setattr(yt_dlp, "YoutubeDL", PrivateVideo)
+    pipeline.analyse_video("p")
+    result = pipeline.analyse_video("p")
+    assert len(calls) == 1 and result["stats"] is None and "Private video" in result["error"]
+
+
+def test_analyse_videos_uses_pool_and_cache(pipeline, monkeypatch, tmp_path):
+    fetched, analysed = [], []
+
+    def fetch(video_id, workdir):
+        fetched.append(video_id)
+        if video_id == "bad":
+            raise DownloadError("network down")
+        path = workdir / f"{video_id}.srt"
+        path.write_text(SRT, encoding="utf-8")
+        return path, False
+
+    analyse_many = pipeline.pool.analyse_many
+    monkeypatch.setattr(pipeline, "fetch_subtitle_file", fetch)
+    monkeypatch.setattr(
+        pipeline.pool, "analyse_many", lambda texts, profile=None: analysed.append(texts) or analyse_many(texts, profile)
+    )
+
+    results = pipeline.analyse_videos(["a", "bad", "a"])
+    assert set(results) == {"a", "bad"}
+    assert results["a"]["stats"]["total_tokens"] == 5 and results["bad"]["stats"] is None
+    assert analysed == [["The year was\n1984\nRun!\nRun!"]]
+
+    pipeline.analyse_videos(["a", "bad"])
+    assert fetched == ["a", "bad"] and len(analysed) == 1